@@ -1,13 +1,56 @@
+import os
+
 from domain.services.dice_roll_service import DiceRollService
 from domain.services.preset_service import PresetService
 from domain.services.character_service import CharacterService
+from domain.services.probability_service import ProbabilityService
+from domain.services.fairness_audit_service import FairnessAuditService
 from domain.models.roll_history import RollHistory
+from domain.models.roll_statistics import RollStatistics
+from storage.roll_journal import RollJournal
 
 
 
 class DiceRollAppController:
-    def __init__(self):
+    # Rolls kept in the session history; older rolls stay in the roll journal.
+    HISTORY_CAPACITY = 500
+
+    def __init__(self, columnar_history=False):
+        """
+        :param columnar_history: Not supported yet; `ColumnarRollHistory` has no running
+            statistics, capacity or per-character and per-dice-type queries.
+        :type columnar_history: bool
+        :raises ValueError: If `columnar_history` is set.
+        """
+        if columnar_history:
+            raise ValueError("The columnar roll history cannot back the app: it has no running statistics, "
+                             "capacity or per-character and per-dice-type queries")
         self.dice_roll_service = DiceRollService()
         self.preset_service = PresetService()
-        self.roll_history = RollHistory()
-        self.character_service = CharacterService()
\ No newline at end of file
+        self.roll_journal = None
+        self.roll_history = RollHistory(DiceRollAppController.HISTORY_CAPACITY, RollHistory.DROP_OLDEST,
+                                        statistics=RollStatistics())
+        self.character_service = CharacterService()
+        self.probability_service = ProbabilityService()
+        self.fairness_audit_service = FairnessAuditService()
+
+    def load_roll_history(self, filename='data/roll_journal.bin'):
+        """
+        Restores the most recent rolls of past sessions, made since the history was
+        last cleared, from the roll journal and records every new roll in it. A file that is not a roll journal is moved
+        aside to the same name followed by `.bad` and a new journal is started.
+        """
+        try:
+            recent_rolls = list(RollJournal.replay(filename, last=DiceRollAppController.HISTORY_CAPACITY,
+                                                   after_clear=True))
+        except ValueError:
+            os.replace(filename, f'{filename}.bad')
+            recent_rolls = []
+        for roll in recent_rolls:
+            self.roll_history.add_roll(roll)
+        self.roll_journal = RollJournal(filename)
+        self.roll_history.journal = self.roll_journal
+
+    def close(self):
+        if self.roll_journal is not None:
+            self.roll_journal.close()
@@ -0,0 +1,369 @@
+"""
+columnar_roll_history.py
+This module provides a column-oriented alternative to `RollHistory` for long
+sessions. Every field of a roll result is kept in its own typed array, and the
+individual dice of all results share one flat buffer indexed by offsets, so the
+history costs a few bytes per result and can be aggregated with NumPy.
+Classes:
+    ColumnarRollHistory: A roll history that stores roll results column by column.
+"""
+
+from array import array
+
+import numpy as np
+
+from domain.models.roll import RollResult
+
+
+class _CodeTable:
+    """
+    Maps repeated values, such as dice types, to small integer codes.
+    """
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+
+class ColumnarRollHistory:
+    """
+    Manages a collection of roll results stored as typed columns.
+
+    It offers the basic methods of `RollHistory` and adds vectorized aggregation
+    over the stored columns. It has no capacity, running statistics or queries by
+    character or dice type, so it cannot stand in for the app's history. Appending is O(1)
+    amortized. Rolls are handed back as `RollResult` objects built on demand from
+    the columns, so changing a returned object does not change the history; use
+    `update_roll` instead.
+
+    :ivar dice_types: The dice type code of each result.
+    :type dice_types: array.array
+    :ivar num_dice: The number of dice of each result.
+    :type num_dice: array.array
+    :ivar dice_modifiers: The modifier of each result.
+    :type dice_modifiers: array.array
+    :ivar dice_totals: The sum of the dice of each result, before the modifier.
+    :type dice_totals: array.array
+    :ivar advantages: The advantage code of each result.
+    :type advantages: array.array
+    :ivar roll_types: The roll type code of each result.
+    :type roll_types: array.array
+    :ivar faces: The individual dice of every result, one result after another.
+    :type faces: array.array
+    :ivar offsets: The start of each result's dice in `faces`, followed by the end
+        of the last result.
+    :type offsets: array.array
+    :ivar journal: Records every added roll so the history outlives the session,
+        e.g. a `RollJournal`, or None.
+    :type journal: RollJournal | None
+    """
+    def __init__(self, journal=None):
+        self.journal = journal
+        self._codes = {column: _CodeTable() for column in ('dice_type', 'advantage', 'roll_type', 'name', 'character_id')}
+        self._clear_columns()
+
+    def add_roll(self, roll):
+        """
+        Adds a roll result to the end of the history.
+
+        :param roll: The roll result to add.
+        :type roll: RollResult
+        """
+        dice_rolls = getattr(roll, 'dice_rolls', ())
+        self.dice_types.append(self._codes['dice_type'].encode(roll.dice_type))
+        self.num_dice.append(int(roll.num_dice))
+        self.dice_modifiers.append(int(roll.dice_modifier))
+        self.dice_totals.append(int(getattr(roll, 'dice_total', 0)))
+        self.advantages.append(self._codes['advantage'].encode(roll.advantage))
+        self.roll_types.append(self._codes['roll_type'].encode(roll.roll_type))
+        self.names.append(self._codes['name'].encode(roll.name))
+        self.character_ids.append(self._codes['character_id'].encode(roll.character_id))
+        self._extend_faces(dice_rolls)
+        self.offsets.append(len(self.faces))
+        if self.journal is not None:
+            self.journal.record(roll)
+
+    def get_rolls_by_type(self, roll_type=None):
+        """
+        Retrieves the roll results, optionally only those of one roll type.
+
+        :param roll_type: The roll type to select, or None for every result.
+        :type roll_type: str | None
+        :return: The matching roll results, oldest first.
+        :rtype: list[RollResult]
+        """
+        if roll_type is None:
+            return [self.get_roll(index) for index in range(len(self))]
+        return [self.get_roll(index) for index in self.get_indexes_by_type(roll_type).tolist()]
+
+    @property
+    def rolls(self):
+        return self.get_rolls_by_type()
+
+    def get_indexes_by_type(self, roll_type):
+        """
+        Returns the positions of the results of one roll type.
+
+        :param roll_type: The roll type to select.
+        :type roll_type: str
+        :rtype: numpy.ndarray
+        """
+        code = self._codes['roll_type'].codes.get(roll_type)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self._column(self.roll_types) == code)
+
+    def get_roll(self, index):
+        """
+        Builds the roll result at the provided index from the columns.
+
+        :param index: The position of the result; negative values count from the end.
+        :type index: int
+        :rtype: RollResult
+        :raises IndexError: If the index is out of range.
+        """
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("Roll index out of range")
+
+        roll = RollResult(self.num_dice[index],
+                          self._codes['dice_type'].decode(self.dice_types[index]),
+                          self.faces[self.offsets[index]:self.offsets[index + 1]],
+                          self.dice_modifiers[index],
+                          self.dice_totals[index],
+                          advantage=self._codes['advantage'].decode(self.advantages[index]))
+        roll.roll_type = self._codes['roll_type'].decode(self.roll_types[index])
+        roll.name = self._codes['name'].decode(self.names[index])
+        roll.character_id = self._codes['character_id'].decode(self.character_ids[index])
+        return roll
+
+    def get_roll_index(self, roll):
+        """
+        Retrieves the index of the first stored result equal to `roll`, comparing
+        every field and the individual dice.
+
+        :param roll: The roll result to find.
+        :type roll: RollResult
+        :rtype: int
+        :raises ValueError: If no stored result matches.
+        """
+        candidates = np.flatnonzero(self._column(self.dice_totals) == getattr(roll, 'dice_total', 0))
+        expected = ColumnarRollHistory._fields(roll)
+        for index in candidates.tolist():
+            if ColumnarRollHistory._fields(self.get_roll(index)) == expected:
+                return index
+        raise ValueError(f"{roll!r} is not in the roll history")
+
+    def update_roll(self, roll, index):
+        """
+        Replaces the result at the specified index.
+
+        :param roll: The new roll result.
+        :type roll: RollResult
+        :param index: The position of the result to replace.
+        :type index: int
+        """
+        index = range(len(self))[index]
+        self.dice_types[index] = self._codes['dice_type'].encode(roll.dice_type)
+        self.num_dice[index] = int(roll.num_dice)
+        self.dice_modifiers[index] = int(roll.dice_modifier)
+        self.dice_totals[index] = int(getattr(roll, 'dice_total', 0))
+        self.advantages[index] = self._codes['advantage'].encode(roll.advantage)
+        self.roll_types[index] = self._codes['roll_type'].encode(roll.roll_type)
+        self.names[index] = self._codes['name'].encode(roll.name)
+        self.character_ids[index] = self._codes['character_id'].encode(roll.character_id)
+
+        start, end = self.offsets[index], self.offsets[index + 1]
+        dice_rolls = getattr(roll, 'dice_rolls', ())
+        tail = self.faces[end:]
+        del self.faces[start:]
+        self._extend_faces(dice_rolls)
+        self.faces.extend(tail)
+        self._shift_offsets(index + 1, len(dice_rolls) - (end - start))
+
+    def remove_roll(self, index):
+        """
+        Removes the result at the specified index.
+
+        :param int index: The zero-based index of the result to remove.
+        """
+        index = range(len(self))[index]
+        start, end = self.offsets[index], self.offsets[index + 1]
+        for column in self._columns():
+            del column[index]
+        del self.faces[start:end]
+        del self.offsets[index + 1]
+        self._shift_offsets(index + 1, start - end)
+
+    def clear(self):
+        """
+        Removes every result from the history.
+        """
+        self._clear_columns()
+        if self.journal is not None:
+            self.journal.record_clear()
+
+    def _clear_columns(self):
+        self.dice_types = array('H')
+        self.num_dice = array('i')
+        self.dice_modifiers = array('i')
+        self.dice_totals = array('q')
+        self.advantages = array('H')
+        self.roll_types = array('H')
+        self.names = array('I')
+        self.character_ids = array('I')
+        self.faces = array('H')
+        self.offsets = array('q', [0])
+
+    def slice(self, start=None, stop=None):
+        """
+        Returns a new history holding the results from `start` to `stop`, copied
+        column by column without building any `RollResult`.
+
+        :param start: The first position, as for a list slice.
+        :type start: int | None
+        :param stop: The position after the last one, as for a list slice.
+        :type stop: int | None
+        :rtype: ColumnarRollHistory
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        history = ColumnarRollHistory()
+        history._codes = self._codes
+        for name in ('dice_types', 'num_dice', 'dice_modifiers', 'dice_totals',
+                     'advantages', 'roll_types', 'names', 'character_ids'):
+            setattr(history, name, getattr(self, name)[start:stop])
+        history.faces = self.faces[self.offsets[start]:self.offsets[stop]]
+        history.offsets = self.offsets[start:stop + 1]
+        history._shift_offsets(0, -self.offsets[start])
+        return history
+
+    def get_totals(self, dice_type=None):
+        """
+        Returns the final totals (dice plus modifier), optionally only for one dice type.
+
+        :param dice_type: The dice type to select, or None for every result.
+        :type dice_type: str | None
+        :rtype: numpy.ndarray
+        """
+        totals = self._column(self.dice_totals) + self._column(self.dice_modifiers)
+        if dice_type is None:
+            return totals
+        return totals[self._dice_type_mask(dice_type)]
+
+    def get_faces(self, dice_type=None):
+        """
+        Returns every individual die rolled, optionally only from results of one dice type.
+
+        :param dice_type: The dice type to select, or None for every result.
+        :type dice_type: str | None
+        :rtype: numpy.ndarray
+        """
+        faces = self._column(self.faces)
+        if dice_type is None:
+            return faces
+        counts = np.diff(self._column(self.offsets))
+        return faces[np.repeat(self._dice_type_mask(dice_type), counts)]
+
+    def count_by_dice_type(self):
+        """
+        Returns how many results were rolled with each dice type.
+
+        :rtype: dict[str, int]
+        """
+        counts = np.bincount(self._column(self.dice_types), minlength=len(self._codes['dice_type'].values))
+        return {dice_type: count for dice_type, count in zip(self._codes['dice_type'].values, counts.tolist())
+                if count}
+
+    def mean_total(self, dice_type=None):
+        """
+        Returns the mean final total, optionally only for one dice type.
+
+        :param dice_type: The dice type to select, or None for every result.
+        :type dice_type: str | None
+        :rtype: float
+        """
+        totals = self.get_totals(dice_type)
+        return float(totals.mean()) if len(totals) else 0.0
+
+    def __len__(self):
+        return len(self.dice_totals)
+
+    def _columns(self):
+        return (self.dice_types, self.num_dice, self.dice_modifiers, self.dice_totals,
+                self.advantages, self.roll_types, self.names, self.character_ids)
+
+    def _extend_faces(self, dice_rolls):
+        if isinstance(dice_rolls, array) and dice_rolls.typecode != self.faces.typecode:
+            dice_rolls = dice_rolls.tolist()
+        try:
+            self.faces.extend(dice_rolls)
+        except OverflowError:
+            # A face above 65535 (an exploding d100 chain never gets there) widens the buffer.
+            self.faces = array('L', self.faces)
+            self.faces.extend(dice_rolls)
+
+    def _shift_offsets(self, start, delta):
+        if delta:
+            offsets = np.frombuffer(self.offsets, dtype=np.int64)
+            offsets[start:] += delta
+            # Release the buffer so the array can be resized again.
+            del offsets
+
+    def _dice_type_mask(self, dice_type):
+        code = self._codes['dice_type'].codes.get(dice_type)
+        return self._column(self.dice_types) == code
+
+    @staticmethod
+    def _column(column):
+        """
+        Copies a column into a NumPy array. The copy keeps the column resizable.
+        """
+        return np.array(column)
+
+    @staticmethod
+    def _fields(roll):
+        return (roll.name, roll.num_dice, roll.dice_type, roll.dice_modifier, roll.advantage,
+                roll.roll_type, roll.character_id, getattr(roll, 'dice_total', 0),
+                list(getattr(roll, 'dice_rolls', ())))
+
+
+if __name__ == '__main__':
+    # Compares memory and aggregation speed against the list-based RollHistory.
+    import random
+    import time
+    import tracemalloc
+
+    from domain.models.roll_history import RollHistory
+
+    samples = [(num_dice, dice_type, [random.randint(1, sides) for _ in range(num_dice)])
+               for num_dice, dice_type, sides in [(1, 'd20', 20), (2, 'd6', 6), (8, 'd6', 6), (1, 'd8', 8)] * 50_000]
+
+    for history_type in (RollHistory, ColumnarRollHistory):
+        tracemalloc.start()
+        history = history_type()
+        for num_dice, dice_type, dice_rolls in samples:
+            history.add_roll(RollResult(num_dice, dice_type, dice_rolls, 2, sum(dice_rolls)))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        if history_type is ColumnarRollHistory:
+            mean = history.mean_total('d6')
+        else:
+            d6_totals = [roll.total for roll in history.get_rolls_by_type() if roll.dice_type == 'd6']
+            mean = sum(d6_totals) / len(d6_totals)
+        seconds = time.perf_counter() - start
+        print(f"{history_type.__name__:<20}: {size / len(samples):6.1f} bytes per result, "
+              f"d6 mean total {mean:.3f} in {seconds * 1000:.1f} ms")
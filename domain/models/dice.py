@@ -8,14 +8,19 @@ Classes:
     Dice: Represents a single die with a specified number of sides.
     DiceRoller: Manages the rolling of multiple dice and the calculation of
     their results.
-Functions:
-    roll_dice(die_string): Rolls a specified die and returns the result.
+Dice expressions such as "2d6 + 3" are parsed and rolled by the
+dice_expression module, which builds on these classes.
 Example:
+    from domain.models.dice_expression import roll_dice
     result = roll_dice("2d6 + 3")
     print(result)
 """
 
-import random
+import heapq
+
+import numpy as np
+
+from domain.models.rng import default_random_source
 
 
 class Die:
@@ -24,9 +29,17 @@ class Die:
     Attributes:
         sides (int): The number of sides on the dice.
         min_roll (int): The minimum value that can be rolled (default is 1).
+        rng (RandomSource): The random source used to roll the die (default is
+            the interpreter-wide `random` generator).
+        explode (bool): Whether rolling the highest face adds another roll (default is False).
+        reroll_below (int | None): Faces below this value are rerolled once and the
+            new roll is kept, e.g. 3 for Great Weapon Fighting (default is None).
+        min_face (int | None): Faces below this value count as this value (default is None).
+        max_explosions (int): The most extra rolls a single exploding die can add.
     Methods:
         roll():
-            Rolls the dice and returns a random integer between min_roll and sides (inclusive).
+            Rolls the dice and returns a random integer between min_roll and sides (inclusive),
+            after applying any reroll, minimum face and exploding rules.
     """
 
     dice_types = {
@@ -39,6 +52,9 @@ class Die:
         "d100": 100,
     }
 
+    # Bounds the cost of an exploding die; the chance of reaching it is at most 1 in 4^10.
+    MAX_EXPLOSIONS = 10
+
     @classmethod
     def get_dice_types(cls):
         """
@@ -49,18 +65,39 @@ class Die:
         """
         return list(cls.dice_types.keys())
 
-    def __init__(self, dice_type, min_roll=1):
+    def __init__(self, dice_type, min_roll=1, rng=None, explode=False, reroll_below=None,
+                 min_face=None, max_explosions=MAX_EXPLOSIONS):
         self.sides = Die.dice_types[dice_type]
         self.min_roll = min_roll
+        self.rng = default_random_source if rng is None else rng
+        self.explode = explode
+        self.reroll_below = reroll_below
+        self.min_face = min_face
+        self.max_explosions = max_explosions
 
     def roll(self):
         """
         Rolls the dice and returns a random integer between min_roll and sides (inclusive).
 
+        A face below `reroll_below` is rerolled once, a face below `min_face` counts
+        as `min_face`, and if the die explodes, every roll of the highest face adds
+        another roll, up to `max_explosions` extra rolls.
+
         Returns:
             int: The result of the dice roll.
         """
-        return random.randint(self.min_roll, self.sides)
+        face = self.rng.randint(self.min_roll, self.sides)
+        if self.reroll_below is not None and face < self.reroll_below:
+            face = self.rng.randint(self.min_roll, self.sides)
+
+        total = face if self.min_face is None else max(face, self.min_face)
+        if self.explode:
+            explosions = 0
+            while face == self.sides and explosions < self.max_explosions:
+                face = self.rng.randint(self.min_roll, self.sides)
+                total += face
+                explosions += 1
+        return total
 
 
 class DiceRoller:
@@ -68,6 +105,8 @@ class DiceRoller:
     DiceRoller is a class for managing and rolling multiple dice.
     Attributes:
         dice (list): A list of dice objects currently managed by the roller.
+        rng (RandomSource): The random source used for the dice the roller creates
+            and for batched rolls.
     Methods:
         add_dice(die):
             Adds a die object to the roller.
@@ -88,10 +127,27 @@ class DiceRoller:
             Rolls all dice and returns both the individual results and their sum.
             Returns:
                 tuple: (list of rolls, sum of rolls)
+        keep_roll(dice_type, num_dice, keep, keep_highest=True):
+            Rolls a pool of dice and keeps the highest (or lowest) `keep` of them.
+            Returns:
+                tuple: (list of all rolls, sum of the kept rolls)
+        multinomial_roll(dice_type, num_dice):
+            Rolls many dice of one type by sampling how often each face comes up.
+            Returns:
+                tuple: (list of rolls in ascending order, sum of rolls)
+        roll_batch(dice_type, num_dice, trials):
+            Rolls num_dice dice of the given type for many trials at once using NumPy.
+            Returns:
+                tuple: (array of per-trial totals, trials x num_dice array of rolls)
+        keep_batch(dice_type, num_dice, keep, keep_highest=True, trials):
+            Batched counterpart of keep_roll.
+            Returns:
+                tuple: (array of per-trial kept totals, trials x num_dice array of rolls)
     """
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self.dice = []
+        self.rng = default_random_source if rng is None else rng
 
     def add_dice(self, die):
         """
@@ -148,8 +204,8 @@ class DiceRoller:
                 - int: The selected roll based on advantage/disadvantage/normal.
         """
         self.clear_dice()
-        self.add_dice(Die("d20"))
-        self.add_dice(Die("d20"))
+        self.add_dice(Die("d20", rng=self.rng))
+        self.add_dice(Die("d20", rng=self.rng))
         rolls = self.roll_all()
         match advantage:
             case 1:
@@ -173,11 +229,153 @@ class DiceRoller:
         dice_rolls = self.roll_all()
         return dice_rolls, sum(dice_rolls)
 
+    def keep_roll(self, dice_type, num_dice, keep, keep_highest=True, **mechanics):
+        """
+        Rolls a pool of dice and keeps only the highest (or lowest) `keep` of them,
+        e.g. 4d6 drop lowest (keep 3 highest) or 3d20 keep highest 1. The kept dice
+        are chosen by partial selection rather than by sorting the whole pool.
+
+        Args:
+            dice_type (str): One of the keys of `Die.dice_types` (e.g. "d6").
+            num_dice (int): The number of dice in the pool.
+            keep (int): The number of dice kept. Dropping N dice is keeping num_dice - N.
+            keep_highest (bool, optional): True to keep the highest dice, False to keep
+                the lowest. Defaults to True.
+            **mechanics: Die rules passed to each `Die`: explode, reroll_below and min_face.
+
+        Returns:
+            tuple: A tuple where the first element is a list of all the dice rolls, in
+                   the order they were rolled, and the second element is the sum of the
+                   kept rolls.
+
+        Raises:
+            ValueError: If `keep` is negative.
+        """
+        if keep < 0:
+            raise ValueError(f"Cannot keep {keep} dice")
+        self.clear_dice()
+        for _ in range(num_dice):
+            self.add_dice(Die(dice_type, rng=self.rng, **mechanics))
+        dice_rolls = self.roll_all()
+        self.clear_dice()
+        if keep >= num_dice:
+            return dice_rolls, sum(dice_rolls)
+        if keep_highest:
+            return dice_rolls, sum(heapq.nlargest(keep, dice_rolls))
+        return dice_rolls, sum(heapq.nsmallest(keep, dice_rolls))
+
+    def multinomial_roll(self, dice_type, num_dice):
+        """
+        Rolls `num_dice` dice of the given type by drawing the number of times each
+        face comes up from a multinomial distribution. The sampling cost depends on
+        the number of sides rather than the number of dice, which makes it suitable
+        for very large dice counts. The dice collection is not used or modified.
+
+        Args:
+            dice_type (str): One of the keys of `Die.dice_types` (e.g. "d6").
+            num_dice (int): The number of dice to roll.
+
+        Returns:
+            tuple: A tuple where the first element is a list of integers representing
+                   the individual rolls in ascending order, and the second element is
+                   an integer representing the sum of all dice rolls.
+        """
+        sides = Die.dice_types[dice_type]
+        faces = np.arange(1, sides + 1)
+        face_counts = self.rng.multinomial(num_dice, sides)
+        dice_total = int(face_counts @ faces)
+        return np.repeat(faces, face_counts).tolist(), dice_total
+
+    def roll_batch(self, dice_type, num_dice, trials=1, explode=False, reroll_below=None,
+                   min_face=None, max_explosions=Die.MAX_EXPLOSIONS):
+        """
+        Rolls `num_dice` dice of the given type for `trials` independent trials in a
+        single array operation. Unlike the per-die methods, this does not use or
+        modify the dice collection, so it is suited to simulating large numbers of
+        rolls. The optional die rules match those of `Die` and are applied to the
+        whole array at once.
+
+        Args:
+            dice_type (str): One of the keys of `Die.dice_types` (e.g. "d6").
+            num_dice (int): The number of dice rolled in each trial.
+            trials (int, optional): The number of independent trials. Defaults to 1.
+            explode (bool, optional): Whether the highest face adds another roll.
+            reroll_below (int, optional): Faces below this value are rerolled once.
+            min_face (int, optional): Faces below this value count as this value.
+            max_explosions (int, optional): The most extra rolls per exploding die.
+
+        Returns:
+            tuple: A tuple containing:
+                - numpy.ndarray: The total of each trial, with shape (trials,).
+                - numpy.ndarray: The result of each die, with shape (trials, num_dice).
+
+        Raises:
+            KeyError: If the dice type is not supported.
+        """
+        sides = Die.dice_types[dice_type]
+        dice_rolls = self.rng.integers(1, sides, (trials, num_dice))
+
+        if reroll_below is not None:
+            rerolled = dice_rolls < reroll_below
+            dice_rolls[rerolled] = self.rng.integers(1, sides, int(rerolled.sum()))
+
+        if explode:
+            exploding = dice_rolls == sides
+            if min_face is not None:
+                np.maximum(dice_rolls, min_face, out=dice_rolls)
+            for _ in range(max_explosions):
+                count = int(exploding.sum())
+                if count == 0:
+                    break
+                extra_rolls = self.rng.integers(1, sides, count)
+                dice_rolls[exploding] += extra_rolls
+                exploding[exploding] = extra_rolls == sides
+        elif min_face is not None:
+            np.maximum(dice_rolls, min_face, out=dice_rolls)
+
+        return dice_rolls.sum(axis=1, dtype=np.int64), dice_rolls
+
+    def keep_batch(self, dice_type, num_dice, keep, keep_highest=True, trials=1, **mechanics):
+        """
+        Rolls a pool of dice for `trials` trials at once and keeps the highest (or
+        lowest) `keep` dice of each trial. The kept dice are found with
+        `numpy.partition`, which avoids fully sorting each trial.
+
+        Args:
+            dice_type (str): One of the keys of `Die.dice_types` (e.g. "d6").
+            num_dice (int): The number of dice in the pool.
+            keep (int): The number of dice kept in each trial.
+            keep_highest (bool, optional): True to keep the highest dice, False to keep
+                the lowest. Defaults to True.
+            trials (int, optional): The number of independent trials. Defaults to 1.
+            **mechanics: Die rules passed to `roll_batch`: explode, reroll_below and min_face.
+
+        Returns:
+            tuple: A tuple containing:
+                - numpy.ndarray: The kept total of each trial, with shape (trials,).
+                - numpy.ndarray: All individual rolls, with shape (trials, num_dice).
+
+        Raises:
+            ValueError: If `keep` is negative.
+        """
+        if keep < 0:
+            raise ValueError(f"Cannot keep {keep} dice")
+        dice_totals, dice_rolls = self.roll_batch(dice_type, num_dice, trials, **mechanics)
+        if keep >= num_dice:
+            return dice_totals, dice_rolls
+        if keep == 0:
+            return np.zeros(trials, dtype=np.int64), dice_rolls
+        if keep_highest:
+            kept = np.partition(dice_rolls, num_dice - keep, axis=1)[:, num_dice - keep:]
+        else:
+            kept = np.partition(dice_rolls, keep - 1, axis=1)[:, :keep]
+        return kept.sum(axis=1, dtype=np.int64), dice_rolls
+
 
 # Example usage
 if __name__ == "__main__":
     check = DiceRoller()
-    check.add_dice(Die(6))
-    check.add_dice(Die(6))
+    check.add_dice(Die("d6"))
+    check.add_dice(Die("d6"))
     result = check.d20_roll(advantage=2)
     print(result)
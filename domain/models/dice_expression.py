@@ -0,0 +1,380 @@
+"""
+dice_expression.py
+This module parses dice expressions such as "2d6 + 3", "4d6dl1" or "d20adv + 5"
+and compiles them into reusable roll plans.
+Syntax:
+    NdS      Roll N dice with S sides (N defaults to 1, "d%" is a d100).
+    khK/kK   Keep the highest K dice of the group.
+    klK      Keep the lowest K dice of the group.
+    dlK      Drop the lowest K dice of the group.
+    dhK      Drop the highest K dice of the group.
+    adv/dis  Roll a single die twice and keep the higher/lower result.
+    !        Explode: every roll of the highest face adds another roll.
+    ro<N     Reroll once any face below N (e.g. "2d6ro<3" for Great Weapon Fighting).
+    minN     Count any face below N as N.
+    + / -    Add or subtract dice groups and integer constants.
+Classes:
+    DiceTerm, ConstantTerm: The nodes of a parsed expression.
+    DiceExpression: The parsed syntax tree of an expression.
+    RollPlan: A compiled expression that can be rolled many times.
+    ExpressionResult: The outcome of rolling a plan once.
+Functions:
+    parse_expression(expression): Parses an expression into a DiceExpression.
+    compile_expression(expression): Returns the cached RollPlan for an expression.
+    roll_dice(expression): Rolls an expression and returns an ExpressionResult.
+Example:
+    result = roll_dice("2d6 + 3")
+    print(result)
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from domain.models.dice import Die, DiceRoller
+from domain.models.distribution import RollDistribution
+
+_TOKEN_PATTERN = re.compile(r"\s*(?:(\d+)|(adv|dis|min|ro|kh|kl|dh|dl|k|d|%|!|<|\+|-))", re.IGNORECASE)
+
+
+class DiceTerm:
+    """
+    A group of identical dice in an expression, with an optional keep rule.
+
+    :ivar sign: 1 if the group is added to the total, -1 if it is subtracted.
+    :type sign: int
+    :ivar count: The number of dice rolled.
+    :type count: int
+    :ivar dice_type: One of the keys of `Die.dice_types` (e.g. "d6").
+    :type dice_type: str
+    :ivar keep: The number of dice kept, or None to keep every die.
+    :type keep: int | None
+    :ivar keep_highest: True to keep the highest dice, False to keep the lowest.
+    :type keep_highest: bool
+    :ivar explode: Whether the highest face adds another roll.
+    :type explode: bool
+    :ivar reroll_below: Faces below this value are rerolled once, or None.
+    :type reroll_below: int | None
+    :ivar min_face: Faces below this value count as this value, or None.
+    :type min_face: int | None
+    """
+    def __init__(self, sign, count, dice_type, keep=None, keep_highest=True,
+                 explode=False, reroll_below=None, min_face=None):
+        self.sign = sign
+        self.count = count
+        self.dice_type = dice_type
+        self.keep = keep
+        self.keep_highest = keep_highest
+        self.explode = explode
+        self.reroll_below = reroll_below
+        self.min_face = min_face
+
+    def __repr__(self):
+        text = f"{self.count}{self.dice_type}"
+        if self.explode:
+            text += "!"
+        if self.reroll_below is not None:
+            text += f"ro<{self.reroll_below}"
+        if self.min_face is not None:
+            text += f"min{self.min_face}"
+        if self.keep is not None:
+            text += f"{'kh' if self.keep_highest else 'kl'}{self.keep}"
+        return text
+
+    @property
+    def mechanics(self):
+        """
+        The die rules of the group, as keyword arguments for `Die` and `DiceRoller`.
+
+        :rtype: dict
+        """
+        return {
+            "explode": self.explode,
+            "reroll_below": self.reroll_below,
+            "min_face": self.min_face,
+        }
+
+
+class ConstantTerm:
+    """
+    An integer constant in an expression.
+
+    :ivar sign: 1 if the constant is added to the total, -1 if it is subtracted.
+    :type sign: int
+    :ivar value: The absolute value of the constant.
+    :type value: int
+    """
+    def __init__(self, sign, value):
+        self.sign = sign
+        self.value = value
+
+    def __repr__(self):
+        return str(self.value)
+
+
+class DiceExpression:
+    """
+    The syntax tree of a dice expression: a signed sum of dice and constant terms.
+
+    :ivar terms: The terms of the expression in the order they were written.
+    :type terms: list[DiceTerm | ConstantTerm]
+    """
+    def __init__(self, terms):
+        self.terms = terms
+
+    def __repr__(self):
+        text = ""
+        for term in self.terms:
+            if text:
+                text += " + " if term.sign > 0 else " - "
+            elif term.sign < 0:
+                text += "-"
+            text += repr(term)
+        return text
+
+
+class _Parser:
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    def _tokenize(self, expression):
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN_PATTERN.match(expression, position)
+            if match is None:
+                raise ValueError(f"Invalid dice expression: {self.expression!r}")
+            number, symbol = match.groups()
+            tokens.append(int(number) if number is not None else symbol.lower())
+            position = match.end()
+        return tokens
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def take_number(self):
+        token = self.take()
+        if not isinstance(token, int):
+            raise ValueError(f"Expected a number in dice expression: {self.expression!r}")
+        return token
+
+    def parse(self):
+        terms = []
+        sign = 1
+        if self.peek() in ('+', '-'):
+            sign = -1 if self.take() == '-' else 1
+        terms.append(self.parse_term(sign))
+        while self.peek() is not None:
+            operator = self.take()
+            if operator not in ('+', '-'):
+                raise ValueError(f"Expected '+' or '-' in dice expression: {self.expression!r}")
+            terms.append(self.parse_term(-1 if operator == '-' else 1))
+        return DiceExpression(terms)
+
+    def parse_term(self, sign):
+        count = None
+        if isinstance(self.peek(), int):
+            count = self.take()
+        if self.peek() != 'd':
+            if count is None:
+                raise ValueError(f"Expected a number or dice in dice expression: {self.expression!r}")
+            return ConstantTerm(sign, count)
+
+        self.take()
+        count = 1 if count is None else count
+        if self.peek() == '%':
+            self.take()
+            sides = 100
+        else:
+            sides = self.take_number()
+        dice_type = f"d{sides}"
+        if dice_type not in Die.dice_types:
+            raise ValueError(f"Unsupported dice type {dice_type!r} in dice expression: {self.expression!r}")
+        term = DiceTerm(sign, count, dice_type)
+
+        while self.peek() in ('k', 'kh', 'kl', 'dl', 'dh', 'adv', 'dis', '!', 'ro', 'min'):
+            match self.take():
+                case 'k' | 'kh':
+                    term.keep = self.take_number()
+                case 'kl':
+                    term.keep, term.keep_highest = self.take_number(), False
+                case 'dl':
+                    term.keep = count - self.take_number()
+                case 'dh':
+                    term.keep, term.keep_highest = count - self.take_number(), False
+                case 'adv' | 'dis' as mode:
+                    if count != 1:
+                        raise ValueError(f"Advantage only applies to a single die: {self.expression!r}")
+                    term.count, term.keep, term.keep_highest = 2, 1, mode == 'adv'
+                case '!':
+                    term.explode = True
+                case 'ro':
+                    if self.take() != '<':
+                        raise ValueError(f"Expected '<' after 'ro' in dice expression: {self.expression!r}")
+                    term.reroll_below = self.take_number()
+                case 'min':
+                    term.min_face = self.take_number()
+                    if term.min_face > sides:
+                        raise ValueError(f"Minimum face {term.min_face} is higher than a {dice_type} "
+                                         f"can roll: {self.expression!r}")
+
+        if term.keep is not None and not 0 <= term.keep <= term.count:
+            raise ValueError(f"Cannot keep {term.keep} of {term.count} dice: {self.expression!r}")
+        return term
+
+
+def parse_expression(expression):
+    """
+    Parses a dice expression into its syntax tree.
+
+    :param expression: The expression to parse, e.g. "2d6 + 3".
+    :type expression: str
+    :return: The parsed expression.
+    :rtype: DiceExpression
+    :raises ValueError: If the expression is not valid.
+    """
+    return _Parser(expression).parse()
+
+
+class ExpressionResult:
+    """
+    The outcome of rolling a dice expression once.
+
+    :ivar expression: The expression that was rolled.
+    :type expression: str
+    :ivar dice_rolls: The rolls of each dice group, in expression order.
+    :type dice_rolls: list[list[int]]
+    :ivar total: The final total, including kept dice and constants.
+    :type total: int
+    """
+    def __init__(self, expression, dice_rolls, total):
+        self.expression = expression
+        self.dice_rolls = dice_rolls
+        self.total = total
+
+    def __repr__(self):
+        return f"{self.expression}: {self.dice_rolls} = {self.total}"
+
+
+class RollPlan:
+    """
+    A compiled dice expression that can be rolled repeatedly without re-parsing.
+
+    :ivar expression: The source expression.
+    :type expression: str
+    :ivar groups: The dice groups of the expression.
+    :type groups: list[DiceTerm]
+    :ivar constant: The sum of the signed constants of the expression.
+    :type constant: int
+    """
+    def __init__(self, expression, syntax_tree):
+        self.expression = expression
+        self.groups = [term for term in syntax_tree.terms if isinstance(term, DiceTerm)]
+        self.constant = sum(term.sign * term.value
+                            for term in syntax_tree.terms if isinstance(term, ConstantTerm))
+
+    def __repr__(self):
+        return f"RollPlan({self.expression!r})"
+
+    def roll(self, roller=None):
+        """
+        Rolls the plan once, one die at a time.
+
+        :param roller: The dice roller used to roll each group. A new roller is
+            created if none is given.
+        :type roller: DiceRoller | None
+        :rtype: ExpressionResult
+        """
+        roller = DiceRoller() if roller is None else roller
+        dice_rolls = []
+        total = self.constant
+        for group in self.groups:
+            keep = group.count if group.keep is None else group.keep
+            rolls, group_total = roller.keep_roll(group.dice_type, group.count, keep,
+                                                  group.keep_highest, **group.mechanics)
+            dice_rolls.append(rolls)
+            total += group.sign * group_total
+        return ExpressionResult(self.expression, dice_rolls, total)
+
+    def roll_batch(self, trials=1, roller=None):
+        """
+        Rolls the plan for many trials at once with the batched NumPy engine.
+
+        :param trials: The number of trials to roll.
+        :type trials: int
+        :param roller: The dice roller whose random source is used. A new roller is
+            created if none is given.
+        :type roller: DiceRoller | None
+        :return: The total of each trial.
+        :rtype: numpy.ndarray
+        """
+        roller = DiceRoller() if roller is None else roller
+        totals = np.full(trials, self.constant, dtype=np.int64)
+        for group in self.groups:
+            keep = group.count if group.keep is None else group.keep
+            group_totals, _ = roller.keep_batch(group.dice_type, group.count, keep,
+                                                group.keep_highest, trials, **group.mechanics)
+            totals += group.sign * group_totals
+        return totals
+
+    def distribution(self):
+        """
+        Returns the exact distribution of the expression total, built by convolving
+        the distributions of its dice groups.
+
+        :rtype: RollDistribution
+        """
+        distribution = RollDistribution([1.0], self.constant)
+        for group in self.groups:
+            keep = group.count if group.keep is None else group.keep
+            group_distribution = RollDistribution.for_keep(group.dice_type, group.count, keep,
+                                                           group.keep_highest, **group.mechanics)
+            if group.sign < 0:
+                group_distribution = group_distribution.negate()
+            distribution = distribution.convolve(group_distribution)
+        return distribution
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expression):
+    """
+    Parses and compiles a dice expression. Plans are cached by expression string,
+    so frequently used expressions are only parsed once.
+
+    :param expression: The expression to compile, e.g. "4d6dl1".
+    :type expression: str
+    :rtype: RollPlan
+    :raises ValueError: If the expression is not valid.
+    """
+    return RollPlan(expression, parse_expression(expression))
+
+
+def roll_dice(expression, roller=None):
+    """
+    Rolls a dice expression once.
+
+    :param expression: The expression to roll, e.g. "2d6 + 3".
+    :type expression: str
+    :param roller: The dice roller to use, or None to create one.
+    :type roller: DiceRoller | None
+    :rtype: ExpressionResult
+    """
+    return compile_expression(expression).roll(roller)
+
+
+if __name__ == "__main__":
+    print(roll_dice("2d6 + 3"))
+    print(roll_dice("4d6dl1"))
+    print(roll_dice("d20adv + 5"))
+    print(roll_dice("2d6ro<3 + 4"))
@@ -0,0 +1,333 @@
+"""
+distribution.py
+This module computes exact probability distributions for dice rolls. Sums of
+dice are built by convolving single-die distributions, switching to an FFT when
+the dice pool is large. Keep-highest/keep-lowest pools, including d20 rolls with
+advantage or disadvantage, are computed by dynamic programming over the order
+statistics of the pool.
+Classes:
+    RollDistribution: The probability mass function of a roll total.
+"""
+
+from math import comb
+
+import numpy as np
+
+from domain.models.dice import Die
+
+
+class RollDistribution:
+    """
+    Represents the exact probability distribution of a roll total.
+
+    The distribution is stored as an array of probabilities for consecutive totals
+    starting at `minimum`. The array is shared between distributions that only
+    differ by a modifier, so shifting a distribution is cheap.
+
+    :ivar probabilities: The probability of each total, starting at `minimum`.
+    :type probabilities: numpy.ndarray
+    :ivar minimum: The lowest possible total.
+    :type minimum: int
+    """
+
+    # Pools whose result spans more totals than this are convolved with an FFT.
+    FFT_THRESHOLD = 512
+
+    def __init__(self, probabilities, minimum):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        probabilities.setflags(write=False)
+        self.probabilities = probabilities
+        self.minimum = minimum
+
+    def __repr__(self):
+        return f"RollDistribution(minimum={self.minimum}, maximum={self.maximum})"
+
+    @property
+    def maximum(self):
+        return self.minimum + len(self.probabilities) - 1
+
+    @property
+    def totals(self):
+        """
+        The possible totals, in the same order as `probabilities`.
+
+        :rtype: numpy.ndarray
+        """
+        return np.arange(self.minimum, self.maximum + 1)
+
+    def pmf(self, total):
+        """
+        Returns the probability of rolling exactly `total`.
+
+        :param total: The roll total.
+        :type total: int
+        :rtype: float
+        """
+        if total < self.minimum or total > self.maximum:
+            return 0.0
+        return float(self.probabilities[total - self.minimum])
+
+    def cdf(self, total):
+        """
+        Returns the probability of rolling `total` or less.
+
+        :param total: The roll total.
+        :type total: int
+        :rtype: float
+        """
+        if total < self.minimum:
+            return 0.0
+        if total >= self.maximum:
+            return 1.0
+        return float(self.probabilities[:total - self.minimum + 1].sum())
+
+    def probability_at_least(self, total):
+        """
+        Returns the probability of rolling `total` or more, e.g. meeting a DC.
+
+        :param total: The roll total.
+        :type total: int
+        :rtype: float
+        """
+        return 1.0 - self.cdf(total - 1)
+
+    def mean(self):
+        return float(self.probabilities @ self.totals)
+
+    def variance(self):
+        deviations = self.totals - self.mean()
+        return float(self.probabilities @ (deviations * deviations))
+
+    def as_dict(self):
+        """
+        Returns the distribution as a mapping of total to probability.
+
+        :rtype: dict[int, float]
+        """
+        return dict(zip(self.totals.tolist(), self.probabilities.tolist()))
+
+    def shift(self, modifier):
+        """
+        Returns the distribution of the total plus `modifier`.
+
+        :param modifier: The modifier added to every total.
+        :type modifier: int
+        :rtype: RollDistribution
+        """
+        return RollDistribution(self.probabilities, self.minimum + modifier)
+
+    def negate(self):
+        """
+        Returns the distribution of the negated total, e.g. for subtracted dice.
+
+        :rtype: RollDistribution
+        """
+        return RollDistribution(self.probabilities[::-1].copy(), -self.maximum)
+
+    def convolve(self, other):
+        """
+        Returns the distribution of the sum of this total and an independent `other`.
+
+        :param other: The distribution of the other total.
+        :type other: RollDistribution
+        :rtype: RollDistribution
+        """
+        return RollDistribution(np.convolve(self.probabilities, other.probabilities),
+                                self.minimum + other.minimum)
+
+    @classmethod
+    def for_die(cls, dice_type, explode=False, reroll_below=None, min_face=None,
+                max_explosions=Die.MAX_EXPLOSIONS):
+        """
+        Returns the distribution of a single die, including the optional rules of
+        `Die`: rerolling once below a value, a minimum face and exploding.
+
+        An exploding die is expanded as a series truncated after `max_explosions`
+        extra rolls, which is exact for dice rolled by `Die` and `DiceRoller`
+        because they stop exploding at the same bound.
+
+        :param dice_type: One of the keys of `Die.dice_types` (e.g. "d6").
+        :type dice_type: str
+        :param explode: Whether the highest face adds another roll.
+        :type explode: bool
+        :param reroll_below: Faces below this value are rerolled once.
+        :type reroll_below: int | None
+        :param min_face: Faces below this value count as this value.
+        :type min_face: int | None
+        :param max_explosions: The most extra rolls an exploding die can add.
+        :type max_explosions: int
+        :rtype: RollDistribution
+        :raises ValueError: If `min_face` is higher than the die can roll.
+        """
+        sides = Die.dice_types[dice_type]
+        uniform = np.full(sides, 1 / sides)
+
+        faces = uniform.copy()
+        if reroll_below is not None:
+            rerolled = faces[:max(reroll_below - 1, 0)].sum()
+            faces[:max(reroll_below - 1, 0)] = 0.0
+            faces += rerolled * uniform
+
+        first = faces.copy()
+        if min_face is not None and min_face > 1:
+            if min_face > sides:
+                raise ValueError(f"Minimum face {min_face} is higher than a {dice_type} can roll")
+            first[min_face - 1] += first[:min_face - 1].sum()
+            first[:min_face - 1] = 0.0
+        if not explode or max_explosions <= 0:
+            return cls(first, 1)
+
+        # Value of the extra rolls started by an explosion, innermost first.
+        extra = uniform
+        for _ in range(max_explosions - 1):
+            extra = cls._explode_once(uniform, extra)
+        probabilities = cls._explode_once(faces, extra)
+        probabilities[:sides - 1] = first[:sides - 1]
+        # Only a rolled top face explodes; faces raised to it by `min_face` do not.
+        probabilities[sides - 1] = first[sides - 1] - faces[sides - 1]
+        return cls(probabilities, 1)
+
+    @classmethod
+    def for_dice_sum(cls, dice_type, num_dice, **mechanics):
+        """
+        Returns the distribution of the sum of `num_dice` dice of the given type.
+
+        Small pools are convolved directly by repeated squaring; large pools are
+        raised to the `num_dice`-th power in the frequency domain with one FFT.
+
+        :param dice_type: One of the keys of `Die.dice_types` (e.g. "d6").
+        :type dice_type: str
+        :param num_dice: The number of dice summed.
+        :type num_dice: int
+        :param mechanics: Die rules passed to `for_die`: explode, reroll_below and min_face.
+        :rtype: RollDistribution
+        """
+        die = cls.for_die(dice_type, **mechanics)
+        if num_dice <= 0:
+            return cls([1.0], 0)
+
+        size = num_dice * (len(die.probabilities) - 1) + 1
+        if size > cls.FFT_THRESHOLD:
+            probabilities = cls._fft_power(die.probabilities, num_dice, size)
+        else:
+            probabilities = cls._convolve_power(die.probabilities, num_dice)
+        return cls(probabilities, num_dice * die.minimum)
+
+    @classmethod
+    def for_advantage(cls, dice_type, advantage):
+        """
+        Returns the distribution of the higher (advantage) or lower (disadvantage)
+        of two dice, matching `DiceRoller.d20_roll`.
+
+        :param dice_type: One of the keys of `Die.dice_types` (e.g. "d20").
+        :type dice_type: str
+        :param advantage: 1 for advantage, 2 for disadvantage.
+        :type advantage: int
+        :rtype: RollDistribution
+        """
+        return cls.for_keep(dice_type, 2, 1, keep_highest=advantage == 1)
+
+    @classmethod
+    def for_keep(cls, dice_type, num_dice, keep, keep_highest=True, **mechanics):
+        """
+        Returns the distribution of the sum of the highest (or lowest) `keep` dice
+        of a pool, matching `DiceRoller.keep_roll`.
+
+        Faces are visited from the most to the least favoured one while tracking
+        how many dice have been placed so far and the sum of the kept dice. The
+        dice placed first are exactly the kept ones, so the number of kept dice
+        follows from the number placed and outcomes never need to be enumerated.
+        The cost is polynomial in the number of sides, dice and kept dice.
+
+        :param dice_type: One of the keys of `Die.dice_types` (e.g. "d6").
+        :type dice_type: str
+        :param num_dice: The number of dice in the pool.
+        :type num_dice: int
+        :param keep: The number of dice kept. Dropping N dice is keeping num_dice - N.
+        :type keep: int
+        :param keep_highest: True to keep the highest dice, False to keep the lowest.
+        :type keep_highest: bool
+        :param mechanics: Die rules passed to `for_die`: explode, reroll_below and min_face.
+        :rtype: RollDistribution
+        """
+        keep = min(keep, num_dice)
+        if keep == num_dice:
+            return cls.for_dice_sum(dice_type, num_dice, **mechanics)
+
+        die = cls.for_die(dice_type, **mechanics)
+        faces = [total for total in die.totals.tolist() if die.pmf(total) > 0]
+        if not keep_highest:
+            faces.reverse()
+
+        # placed[count][total]: probability weight of `count` dice placed on the
+        # faces visited so far, with the kept ones among them summing to `total`.
+        placed = np.zeros((num_dice + 1, keep * die.maximum + 1))
+        placed[0, 0] = 1.0
+        for face in reversed(faces):
+            probability = die.pmf(face)
+            updated = np.zeros_like(placed)
+            for count in range(num_dice + 1):
+                row = placed[count]
+                if not row.any():
+                    continue
+                for extra in range(num_dice - count + 1):
+                    weight = comb(num_dice - count, extra) * probability ** extra
+                    shift = face * min(extra, max(keep - count, 0))
+                    updated[count + extra, shift:] += weight * row[:len(row) - shift]
+            placed = updated
+        return cls(placed[num_dice, keep:], keep)
+
+    @classmethod
+    def for_roll(cls, num_dice, dice_type, dice_modifier=0, advantage=0):
+        """
+        Returns the distribution of a roll with the same arguments as
+        `DiceRollService.roll_dice`. Advantage only applies to a single d20.
+
+        :param num_dice: The number of dice rolled.
+        :type num_dice: int
+        :param dice_type: The type of dice being rolled (e.g., d6, d20).
+        :type dice_type: str
+        :param dice_modifier: The modifier added to the total.
+        :type dice_modifier: int
+        :param advantage: 1 for advantage, 2 for disadvantage, anything else for normal.
+        :type advantage: int
+        :rtype: RollDistribution
+        """
+        if num_dice == 1 and dice_type == 'd20' and advantage in (1, 2):
+            distribution = cls.for_advantage(dice_type, advantage)
+        else:
+            distribution = cls.for_dice_sum(dice_type, num_dice)
+        return distribution.shift(dice_modifier)
+
+    @staticmethod
+    def _explode_once(faces, extra):
+        """
+        Returns the distribution of a die with face probabilities `faces` whose
+        highest face adds a further roll distributed as `extra` (starting at 1).
+        """
+        sides = len(faces)
+        probabilities = np.zeros(sides + len(extra))
+        probabilities[:sides - 1] = faces[:sides - 1]
+        probabilities[sides:] = faces[sides - 1] * extra
+        return probabilities
+
+    @staticmethod
+    def _convolve_power(probabilities, power):
+        result = np.ones(1)
+        base = probabilities
+        while power:
+            if power & 1:
+                result = np.convolve(result, base)
+            power >>= 1
+            if power:
+                base = np.convolve(base, base)
+        return result
+
+    @staticmethod
+    def _fft_power(probabilities, power, size):
+        length = 1 << (size - 1).bit_length()
+        spectrum = np.fft.rfft(probabilities, length) ** power
+        result = np.fft.irfft(spectrum, length)[:size]
+        # Round-off leaves tiny negative values in the far tails.
+        np.clip(result, 0.0, None, out=result)
+        return result / result.sum()
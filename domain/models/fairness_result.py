@@ -0,0 +1,142 @@
+"""
+fairness_result.py
+This module tests whether the faces rolled on a die are consistent with a fair
+die, using a chi-square goodness-of-fit test and a Kolmogorov-Smirnov test
+against the uniform distribution of `Die.dice_types`.
+Classes:
+    FairnessResult: The outcome of the fairness tests for one dice type.
+"""
+
+import math
+
+import numpy as np
+
+from domain.models.dice import Die
+
+
+class FairnessResult:
+    """
+    Represents the fairness tests of the faces rolled on one dice type.
+
+    A low p-value means the observed faces would be unlikely from a fair die. The
+    Kolmogorov-Smirnov p-value uses the asymptotic Kolmogorov distribution, which
+    is conservative for a die's discrete faces.
+
+    :ivar dice_type: The dice type tested (e.g., d6, d20).
+    :type dice_type: str
+    :ivar counts: The number of times each face came up, starting at face 1.
+    :type counts: numpy.ndarray
+    :ivar invalid_faces: The number of faces outside 1 to the number of sides.
+    :type invalid_faces: int
+    :ivar chi_square: The chi-square statistic.
+    :type chi_square: float
+    :ivar chi_square_p_value: The probability of a chi-square statistic at least
+        this large from a fair die.
+    :type chi_square_p_value: float
+    :ivar ks_statistic: The largest distance between the observed and the fair
+        cumulative distributions.
+    :type ks_statistic: float
+    :ivar ks_p_value: The probability of a distance at least this large from a fair die.
+    :type ks_p_value: float
+    """
+    # Fair dice are flagged with a p-value below this at most once in a hundred audits.
+    SIGNIFICANCE = 0.01
+
+    def __init__(self, dice_type, counts, invalid_faces=0):
+        """
+        :param dice_type: One of the keys of `Die.dice_types` (e.g. "d6").
+        :type dice_type: str
+        :param counts: The number of times each face came up, starting at face 1.
+        :type counts: Sequence[int]
+        :param invalid_faces: The number of faces outside the die's range.
+        :type invalid_faces: int
+        """
+        sides = Die.dice_types[dice_type]
+        self.dice_type = dice_type
+        self.counts = np.zeros(sides, dtype=np.int64)
+        self.counts[:len(counts)] = counts
+        self.invalid_faces = invalid_faces
+
+        rolls = self.rolls
+        if rolls == 0:
+            self.chi_square, self.chi_square_p_value = 0.0, 1.0
+            self.ks_statistic, self.ks_p_value = 0.0, 1.0
+            return
+
+        expected = rolls / sides
+        self.chi_square = float(((self.counts - expected) ** 2).sum() / expected)
+        self.chi_square_p_value = FairnessResult._chi_square_survival(self.chi_square, sides - 1)
+
+        observed_cdf = np.cumsum(self.counts) / rolls
+        fair_cdf = np.arange(1, sides + 1) / sides
+        self.ks_statistic = float(np.abs(observed_cdf - fair_cdf).max())
+        self.ks_p_value = FairnessResult._kolmogorov_survival(self.ks_statistic * math.sqrt(rolls))
+
+    def __repr__(self):
+        return (f"FairnessResult({self.dice_type}, rolls={self.rolls}, "
+                f"chi_square_p={self.chi_square_p_value:.4f}, ks_p={self.ks_p_value:.4f})")
+
+    @property
+    def rolls(self):
+        return int(self.counts.sum())
+
+    def is_fair(self, significance=SIGNIFICANCE):
+        """
+        Returns whether neither test rejects a fair die at the given significance.
+
+        :param significance: The significance level, e.g. 0.01.
+        :type significance: float
+        :rtype: bool
+        """
+        return (self.invalid_faces == 0
+                and self.chi_square_p_value >= significance
+                and self.ks_p_value >= significance)
+
+    @staticmethod
+    def _chi_square_survival(statistic, degrees_of_freedom):
+        return FairnessResult._regularized_gamma_q(degrees_of_freedom / 2, statistic / 2)
+
+    @staticmethod
+    def _regularized_gamma_q(a, x):
+        """
+        Returns the regularized upper incomplete gamma function Q(a, x), using its
+        series below a + 1 and its continued fraction above.
+        """
+        if x <= 0:
+            return 1.0
+        log_prefactor = a * math.log(x) - x - math.lgamma(a)
+        if x < a + 1:
+            term = total = 1 / a
+            denominator = a
+            while abs(term) > abs(total) * 1e-15:
+                denominator += 1
+                term *= x / denominator
+                total += term
+            return max(0.0, 1.0 - total * math.exp(log_prefactor))
+
+        # Modified Lentz evaluation of the continued fraction.
+        tiny = 1e-300
+        b = x + 1 - a
+        c = 1 / tiny
+        d = 1 / b
+        fraction = d
+        for step in range(1, 1000):
+            an = -step * (step - a)
+            b += 2
+            d = an * d + b
+            d = tiny if abs(d) < tiny else d
+            c = b + an / c
+            c = tiny if abs(c) < tiny else c
+            d = 1 / d
+            delta = d * c
+            fraction *= delta
+            if abs(delta - 1) < 1e-15:
+                break
+        return min(1.0, math.exp(log_prefactor) * fraction)
+
+    @staticmethod
+    def _kolmogorov_survival(value):
+        if value < 0.2:
+            return 1.0
+        total = sum((-1) ** (j - 1) * math.exp(-2 * j * j * value * value) for j in range(1, 101))
+        return min(1.0, max(0.0, 2 * total))
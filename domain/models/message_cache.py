@@ -0,0 +1,133 @@
+"""
+message_cache.py
+This module caches generated roll messages so that repeated d20 results are
+answered without calling the content generation model again.
+Classes:
+    MessageCache: A thread-safe LRU cache of message variants with a time to live.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class MessageCache:
+    """
+    Caches several message variants per key, serving them in rotation so that a
+    repeated result does not always get the same message.
+
+    Keys are (adjective, face) pairs. The least recently used key is evicted once
+    more than `capacity` keys are cached, and variants older than `ttl` seconds are
+    dropped when their key is next read. Timestamps are wall-clock times so that a
+    cache saved to disk keeps expiring across sessions.
+
+    :ivar capacity: The maximum number of keys cached.
+    :type capacity: int
+    :ivar variants: The number of variants kept per key.
+    :type variants: int
+    :ivar ttl: The number of seconds a variant stays valid.
+    :type ttl: float
+    """
+    def __init__(self, capacity=64, variants=3, ttl=7 * 24 * 60 * 60):
+        """
+        :param capacity: The maximum number of keys cached.
+        :type capacity: int
+        :param variants: The number of variants kept per key.
+        :type variants: int
+        :param ttl: The number of seconds a variant stays valid.
+        :type ttl: float
+        :raises ValueError: If capacity or variants is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("Cache capacity must be positive")
+        if variants < 1:
+            raise ValueError("Message variants must be positive")
+        self.capacity = capacity
+        self.variants = variants
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._next_variant = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns the next fresh variant cached for a key, or None.
+
+        :param key: The (adjective, face) key.
+        :type key: tuple[str, int]
+        :rtype: str | None
+        """
+        with self._lock:
+            entries = self._fresh_entries(key)
+            if not entries:
+                return None
+            self._entries.move_to_end(key)
+            index = self._next_variant.get(key, 0) % len(entries)
+            self._next_variant[key] = index + 1
+            return entries[index][1]
+
+    def add(self, key, message, created=None):
+        """
+        Caches a variant for a key, replacing the oldest variant if the key is full.
+
+        :param key: The (adjective, face) key.
+        :type key: tuple[str, int]
+        :param message: The generated message.
+        :type message: str
+        :param created: When the message was generated, defaults to now.
+        :type created: float | None
+        """
+        created = time.time() if created is None else created
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None:
+                entries = self._entries[key] = []
+            self._entries.move_to_end(key)
+            if message in (text for _, text in entries):
+                return
+            entries.append((created, message))
+            entries.sort()
+            del entries[:-self.variants]
+            while len(self._entries) > self.capacity:
+                evicted, _ = self._entries.popitem(last=False)
+                self._next_variant.pop(evicted, None)
+
+    def missing(self, key):
+        """
+        Returns how many more variants the key can take before it is full.
+
+        :param key: The (adjective, face) key.
+        :type key: tuple[str, int]
+        :rtype: int
+        """
+        with self._lock:
+            return self.variants - len(self._fresh_entries(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._next_variant.clear()
+
+    def items(self):
+        """
+        Returns the fresh variants of every key, least recently used first.
+
+        :return: (key, [(created, message), ...]) pairs.
+        :rtype: list[tuple[tuple[str, int], list[tuple[float, str]]]]
+        """
+        with self._lock:
+            return [(key, list(entries)) for key in list(self._entries)
+                    if (entries := self._fresh_entries(key))]
+
+    def _fresh_entries(self, key):
+        entries = self._entries.get(key)
+        if not entries:
+            return []
+        expiry = time.time() - self.ttl
+        if entries[0][0] < expiry:
+            entries[:] = [entry for entry in entries if entry[0] >= expiry]
+        return entries
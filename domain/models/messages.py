@@ -2,11 +2,11 @@
 application."""
 
 import os
+import queue
+import threading
 
-from dotenv import load_dotenv
-
-from google import genai
-from google.genai import types
+from domain.models.message_cache import MessageCache
+from storage.message_cache_repository import MessageCacheRepository
 
 class Messages:
     """
@@ -16,16 +16,53 @@ class Messages:
     like a d20 roll result. It utilizes a content generation model for dynamic and contextually
     appropriate responses.
 
-    :ivar gemini_api_key: API key for authentication with the content generation model.
-    :type gemini_api_key: str
-    :ivar client: Client object for interacting with the content generation model.
-    :type client: genai.Client
+    The google-genai and dotenv packages are only imported, and the client only
+    built, when the first message is generated, so creating a `Messages` does not
+    slow down startup.
+
+    :ivar gemini_api_key: API key for authentication with the content generation model,
+        read from .env when the client is built.
+    :type gemini_api_key: str | None
+    :ivar cache: Generated messages by (adjective, face), served in rotation.
+    :type cache: MessageCache
+    :ivar cache_filename: Where the cache is kept between sessions, or None to keep it in memory.
+    :type cache_filename: str | None
     """
-    def __init__(self):
-        load_dotenv('.env')
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=self.gemini_api_key)
+    def __init__(self, cache=None, cache_filename='data/message_cache.json'):
+        """
+        :param cache: The message cache, a new `MessageCache` by default.
+        :type cache: MessageCache | None
+        :param cache_filename: The file the cache is loaded from and saved to, or None.
+        :type cache_filename: str | None
+        """
+        self.gemini_api_key = None
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = "gemini-2.5-flash"
+        self.cache = MessageCache() if cache is None else cache
+        self.cache_filename = cache_filename
+        if cache_filename is not None:
+            MessageCacheRepository.load_cache_from_file(self.cache, cache_filename)
+        self._prefetch_queue = queue.Queue()
+        self._prefetcher = None
+        self._prefetch_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        The client object for interacting with the content generation model, built on first use.
+
+        :rtype: genai.Client
+        """
+        with self._client_lock:
+            if self._client is None:
+                from dotenv import load_dotenv
+                from google import genai
+
+                load_dotenv('.env')
+                self.gemini_api_key = os.getenv("GEMINI_API_KEY")
+                self._client = genai.Client(api_key=self.gemini_api_key)
+            return self._client
 
     def get_ai_response(self, prompt):
         """
@@ -59,34 +96,99 @@ class Messages:
         This method generates and returns a message corresponding to the provided result
         of a d20 roll. The message is dynamically generated through a content generation
         model, and it reflects the mood or reaction appropriate for the given roll result.
+        Cached variants are served first; on a miss the model is called and the rest of
+        the result's variants are prefetched in the background.
 
         :param result: The numerical outcome of the d20 roll.
         :type result: int
         :return: A string message reflecting the mood or reaction based on the roll result.
         :rtype: str
         """
-        result_text = ""
-        adjective = ""
+        adjective = Messages.get_adjective(result)
+        if adjective is None:
+            return f"Roll Result: {result}"
+
+        key = (adjective, result)
+        result_text = self.cache.get(key)
+        if result_text is None:
+            result_text = self.get_ai_response(Messages.get_prompt(adjective, result))
+            if result_text:
+                self.cache.add(key, result_text)
+            self.prefetch([result])
+
+        return result_text
+
+    def prefetch(self, results=range(1, 21)):
+        """
+        Fills the cache with every variant of the given d20 results on a background
+        thread, skipping variants that are already cached.
+
+        :param results: The d20 results to prefetch.
+        :type results: Iterable[int]
+        """
+        keys = [(adjective, result) for result in results
+                if (adjective := Messages.get_adjective(result)) is not None]
+        with self._prefetch_lock:
+            for key in keys:
+                self._prefetch_queue.put(key)
+            if self._prefetcher is None:
+                self._prefetcher = threading.Thread(target=self._prefetch, args=(self._prefetch_queue,),
+                                                    name='message-prefetch', daemon=True)
+                self._prefetcher.start()
+
+    def close(self):
+        """
+        Stops prefetching and saves the cache if it is kept between sessions.
+        """
+        with self._prefetch_lock:
+            prefetcher, self._prefetcher = self._prefetcher, None
+            if prefetcher is not None:
+                self._prefetch_queue.put(None)
+                self._prefetch_queue = queue.Queue()
+        if self.cache_filename is not None:
+            MessageCacheRepository.save_cache_to_file(self.cache, self.cache_filename)
+
+    def _prefetch(self, keys):
+        while (key := keys.get()) is not None:
+            for _ in range(self.cache.missing(key)):
+                result_text = self.get_ai_response(Messages.get_prompt(*key))
+                # Errors come back empty; leave the key for a later request instead of retrying now.
+                if not result_text:
+                    break
+                self.cache.add(key, result_text)
+
+    @staticmethod
+    def get_adjective(result):
+        """
+        Returns the mood of the reaction to a d20 result, or None if it gets no reaction.
+
+        :param result: The d20 roll result.
+        :type result: int
+        :rtype: str | None
+        """
         match result:
             case s if s == 1:
-                adjective="miserable"
+                return "miserable"
             case s if 2 <= s <= 10:
-                adjective = "sad"
+                return "sad"
             case s if 11 <= s < 15:
-                adjective = "neutral"
+                return "neutral"
             case s if 16 <= s < 20:
-                adjective = "happy"
+                return "happy"
             case s if s == 20:
-                adjective = "excited"
+                return "excited"
             case _:
-                result_text = f"Roll Result: {result}"
+                return None
 
-        if result_text == "":
-            result_text=self.get_ai_response(f"Write a quick one sentence {adjective} reaction getting a {s} on a d20.")
-
-        return result_text
+    @staticmethod
+    def get_prompt(adjective, result):
+        return f"Write a quick one sentence {adjective} reaction getting a {result} on a d20."
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from google import genai
+    from google.genai import types
+
     load_dotenv()
     gemini_api_key = os.getenv("GEMINI_API_KEY")
     client = genai.Client(api_key=gemini_api_key)
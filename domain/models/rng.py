@@ -0,0 +1,296 @@
+"""
+rng.py
+This module provides the random number sources used to roll dice. Every source
+offers the same small interface, so dice, dice rollers and services can be given
+a seeded, splittable or cryptographic source without changing how they roll.
+Classes:
+    RandomSource: The interface shared by all random sources.
+    PythonRandomSource: A source backed by random.Random (or the random module).
+    NumpyRandomSource: A source backed by a NumPy PCG64 or Philox bit generator.
+    SystemRandomSource: A cryptographic source backed by the operating system.
+    BufferedRandomSource: Serves single die rolls from pre-filled entropy pools.
+Functions:
+    create_random_source(kind, seed, buffered): Creates a source by name.
+Example:
+    rng = create_random_source("pcg64", seed=42)
+    workers = rng.spawn(4)
+Run `python -m domain.models.rng` to benchmark buffered single die rolls.
+"""
+
+import os
+import random
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+def _uniform_below(random_bytes, span, count):
+    """
+    Draws `count` unbiased integers in [0, span) from raw 32-bit words, rejecting
+    words from the incomplete final block so every value is equally likely.
+    """
+    limit = (1 << 32) - (1 << 32) % span
+    values = np.empty(0, dtype=np.uint32)
+    while len(values) < count:
+        words = np.frombuffer(random_bytes(4 * (count - len(values)) + 64), dtype=np.uint32)
+        values = np.concatenate((values, words[words < limit]))
+    return values[:count] % span
+
+
+class RandomSource(ABC):
+    """
+    The interface shared by all random sources.
+
+    Subclasses must implement `randint`, `integers`, `random_bytes` and `spawn`.
+    `multinomial` has a generic implementation that subclasses backed by NumPy
+    override.
+    """
+
+    @abstractmethod
+    def randint(self, low, high):
+        """
+        Returns a random integer between low and high (inclusive).
+
+        :rtype: int
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def integers(self, low, high, size):
+        """
+        Returns an array of random integers between low and high (inclusive).
+
+        :param size: The shape of the returned array.
+        :type size: int | tuple[int, ...]
+        :rtype: numpy.ndarray
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def random_bytes(self, count):
+        """
+        Returns `count` random bytes.
+
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def multinomial(self, count, sides):
+        """
+        Returns how many of `count` fair dice with `sides` sides show each face.
+
+        :return: An array of length `sides` whose entries sum to `count`.
+        :rtype: numpy.ndarray
+        """
+        faces = self.integers(0, sides - 1, count)
+        return np.bincount(faces, minlength=sides)
+
+    @abstractmethod
+    def spawn(self, count):
+        """
+        Returns `count` independent sources, e.g. one per worker thread or process.
+
+        :rtype: list[RandomSource]
+        """
+        raise NotImplementedError
+
+
+class PythonRandomSource(RandomSource):
+    """
+    A random source backed by `random.Random`.
+
+    Batched draws use a NumPy generator seeded from this source, so a seeded
+    source reproduces both single and batched rolls exactly.
+
+    :ivar generator: The underlying generator. Passing the `random` module itself
+        shares the interpreter-wide generator, so `random.seed` still applies.
+    :type generator: random.Random
+    """
+
+    def __init__(self, seed=None, generator=None):
+        self.generator = random.Random(seed) if generator is None else generator
+
+    def randint(self, low, high):
+        return self.generator.randint(low, high)
+
+    def integers(self, low, high, size):
+        return self._numpy_generator().integers(low, high, size=size, endpoint=True, dtype=np.int32)
+
+    def random_bytes(self, count):
+        return self.generator.randbytes(count)
+
+    def multinomial(self, count, sides):
+        return self._numpy_generator().multinomial(count, np.full(sides, 1 / sides))
+
+    def spawn(self, count):
+        return [PythonRandomSource(seed=self.generator.getrandbits(128)) for _ in range(count)]
+
+    def _numpy_generator(self):
+        return np.random.default_rng(self.generator.getrandbits(128))
+
+
+class NumpyRandomSource(RandomSource):
+    """
+    A random source backed by a NumPy bit generator.
+
+    Spawned sources use independent child streams of the seed sequence, so they
+    can be handed to parallel workers without overlapping.
+
+    :ivar bit_generator: The name of the bit generator ("pcg64" or "philox").
+    :type bit_generator: str
+    :ivar seed_sequence: The seed sequence the generator was created from.
+    :type seed_sequence: numpy.random.SeedSequence
+    :ivar generator: The NumPy generator.
+    :type generator: numpy.random.Generator
+    """
+
+    bit_generators = {
+        "pcg64": np.random.PCG64,
+        "philox": np.random.Philox,
+    }
+
+    def __init__(self, seed=None, bit_generator="pcg64"):
+        if bit_generator not in NumpyRandomSource.bit_generators:
+            raise ValueError(f"Unsupported bit generator: {bit_generator}")
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.bit_generator = bit_generator
+        self.seed_sequence = seed
+        self.generator = np.random.Generator(NumpyRandomSource.bit_generators[bit_generator](seed))
+
+    def randint(self, low, high):
+        return int(self.generator.integers(low, high, endpoint=True))
+
+    def integers(self, low, high, size):
+        return self.generator.integers(low, high, size=size, endpoint=True, dtype=np.int32)
+
+    def random_bytes(self, count):
+        return self.generator.bytes(count)
+
+    def multinomial(self, count, sides):
+        return self.generator.multinomial(count, np.full(sides, 1 / sides))
+
+    def spawn(self, count):
+        return [NumpyRandomSource(child, self.bit_generator)
+                for child in self.seed_sequence.spawn(count)]
+
+
+class SystemRandomSource(RandomSource):
+    """
+    A cryptographic random source backed by the operating system (`os.urandom`).
+
+    It cannot be seeded, so its rolls are never reproducible.
+    """
+
+    def __init__(self):
+        self.generator = random.SystemRandom()
+
+    def randint(self, low, high):
+        return self.generator.randint(low, high)
+
+    def integers(self, low, high, size):
+        values = _uniform_below(self.random_bytes, high - low + 1, int(np.prod(size)))
+        return values.astype(np.int32).reshape(size) + low
+
+    def random_bytes(self, count):
+        return os.urandom(count)
+
+    def spawn(self, count):
+        return [SystemRandomSource() for _ in range(count)]
+
+
+class BufferedRandomSource(RandomSource):
+    """
+    A random source that serves single die rolls from pre-filled entropy pools.
+
+    Raw bytes are drawn from the wrapped source in bulk and turned into one pool
+    of unbiased values per die size by rejection sampling, so each `randint` call
+    only has to take the next value from a list. Batched draws are passed through
+    to the wrapped source. A seeded wrapped source keeps rolls reproducible.
+
+    :ivar source: The wrapped source the raw bytes are drawn from.
+    :type source: RandomSource
+    :ivar buffer_size: The number of values drawn per refill of a pool.
+    :type buffer_size: int
+    """
+
+    BUFFER_SIZE = 4096
+
+    def __init__(self, source=None, buffer_size=BUFFER_SIZE):
+        self.source = default_random_source if source is None else source
+        self.buffer_size = buffer_size
+        self._pools = {}
+
+    def randint(self, low, high):
+        pool = self._pools.get(high - low + 1)
+        if not pool:
+            pool = self._refill(high - low + 1)
+        return low + pool.pop()
+
+    def integers(self, low, high, size):
+        return self.source.integers(low, high, size)
+
+    def random_bytes(self, count):
+        return self.source.random_bytes(count)
+
+    def multinomial(self, count, sides):
+        return self.source.multinomial(count, sides)
+
+    def spawn(self, count):
+        return [BufferedRandomSource(child, self.buffer_size) for child in self.source.spawn(count)]
+
+    def _refill(self, span):
+        pool = _uniform_below(self.source.random_bytes, span, self.buffer_size).tolist()
+        self._pools[span] = pool
+        return pool
+
+
+def create_random_source(kind="python", seed=None, buffered=False):
+    """
+    Creates a random source by name.
+
+    :param kind: "python", "pcg64", "philox" or "system".
+    :type kind: str
+    :param seed: The seed for reproducible sources. Ignored by "system".
+    :type seed: int | None
+    :param buffered: Wraps the source in a BufferedRandomSource for fast single rolls.
+    :type buffered: bool
+    :rtype: RandomSource
+    :raises ValueError: If the kind is not supported.
+    """
+    source = _create_unbuffered_source(kind, seed)
+    return BufferedRandomSource(source) if buffered else source
+
+
+def _create_unbuffered_source(kind, seed):
+    match kind:
+        case "python":
+            return PythonRandomSource(seed)
+        case "pcg64" | "philox":
+            return NumpyRandomSource(seed, kind)
+        case "system":
+            return SystemRandomSource()
+        case _:
+            raise ValueError(f"Unsupported random source: {kind}")
+
+
+# Shares the interpreter-wide generator, so dice keep honouring random.seed().
+default_random_source = PythonRandomSource(generator=random)
+
+
+if __name__ == "__main__":
+    # Compares single die rolls with and without the buffered entropy pool.
+    import timeit
+
+    from domain.models.dice import Die
+
+    rolls = 1_000_000
+    for name, rng in [
+        ("random module", default_random_source),
+        ("buffered random module", BufferedRandomSource()),
+        ("pcg64", create_random_source("pcg64")),
+        ("buffered pcg64", create_random_source("pcg64", buffered=True)),
+    ]:
+        die = Die("d20", rng=rng)
+        seconds = timeit.timeit(die.roll, number=rolls)
+        print(f"{name:>24}: {seconds / rolls * 1e9:7.1f} ns per roll")
@@ -1,4 +1,5 @@
 import json
+from array import array
 
 class Roll:
     """
@@ -23,6 +24,15 @@ class Roll:
         'disadvantage').
     :type advantage: str
     """
+    # Slots instead of a per-instance __dict__ keep large session logs compact.
+    __slots__ = ('name', 'num_dice', 'dice_type', 'dice_modifier', 'advantage', 'roll_type', 'character_id')
+
+    advantage_modes = {
+        "normal_roll": 0,
+        "advantage_roll": 1,
+        "disadvantage_roll": 2,
+    }
+
     def __init__(self, num_dice, dice_type, dice_modifier,
                  name='', advantage='normal_roll', roll_type='custom',
                  character_id=None, **kwargs):
@@ -45,6 +55,25 @@ class Roll:
         else:
             return f"{self.name}: {self.num_dice}{self.dice_type}{modifier_str}"
 
+    @staticmethod
+    def get_advantage_mode(advantage):
+        """
+        Converts an advantage setting into the integer mode used by the dice roller.
+
+        Presets store the advantage as a string ('normal_roll', 'advantage_roll',
+        'disadvantage_roll') while the dice roller works with integers (1 for
+        advantage, 2 for disadvantage). Integers other than 1 and 2 are treated as
+        a normal roll.
+
+        :param advantage: The advantage setting as a string or an integer.
+        :type advantage: str | int
+        :return: 1 for advantage, 2 for disadvantage, 0 for a normal roll.
+        :rtype: int
+        """
+        if isinstance(advantage, str):
+            return Roll.advantage_modes.get(advantage, 0)
+        return advantage if advantage in (1, 2) else 0
+
     @staticmethod
     def encode_roll(roll):
         """
@@ -63,7 +92,7 @@ class Roll:
         :raises TypeError: If the provided object is not an instance of `Roll`.
         """
         if isinstance(roll, Roll):
-            return roll.__dict__
+            return {field: getattr(roll, field) for field in Roll.__slots__}
         else:
             raise TypeError("Object is not a Roll")
 
@@ -97,19 +126,55 @@ class RollResult (Roll):
 
     :ivar dice_total: The sum of the rolled dice values before applying the modifier.
     :type dice_total: int
-    :ivar dice_rolls: The individual results of the dice rolls.
-    :type dice_rolls: list[int]
+    :ivar dice_rolls: The individual results of the dice rolls, stored as a compact
+        array of unsigned bytes (or shorts for faces above 255).
+    :type dice_rolls: array.array
     :ivar sign: The arithmetic sign (+ or -) based on the modifier.
     :type sign: str
     :ivar total: The final total after calculating dice sum and applying the modifier.
     :type total: int
     """
+    __slots__ = ('dice_total', '_dice_rolls')
+
     def __init__(self, num_dice, dice_type, dice_rolls, dice_modifier, dice_total, advantage='normal_roll'):
-        super().__init__(num_dice, dice_type, dice_modifier, advantage)
+        super().__init__(num_dice, dice_type, dice_modifier, advantage=advantage)
         self.dice_total = dice_total
         self.dice_rolls = dice_rolls
-        self.sign = "+" if dice_modifier >= 0 else "-"
-        self.total = dice_total + dice_modifier
+
+    @property
+    def dice_rolls(self):
+        return self._dice_rolls
+
+    @dice_rolls.setter
+    def dice_rolls(self, dice_rolls):
+        self._dice_rolls = RollResult.pack_rolls(dice_rolls)
+
+    @property
+    def sign(self):
+        return "+" if self.dice_modifier >= 0 else "-"
+
+    @property
+    def total(self):
+        return self.dice_total + self.dice_modifier
+
+    @staticmethod
+    def pack_rolls(dice_rolls):
+        """
+        Packs individual dice results into the smallest array type that holds them.
+
+        :param dice_rolls: The individual results of the dice rolls.
+        :type dice_rolls: Iterable[int]
+        :rtype: array.array
+        """
+        if isinstance(dice_rolls, array):
+            return dice_rolls
+        dice_rolls = list(dice_rolls)
+        highest = max(dice_rolls, default=0)
+        if highest <= 0xFF:
+            return array('B', dice_rolls)
+        if highest <= 0xFFFF:
+            return array('H', dice_rolls)
+        return array('L', dice_rolls)
 
     def get_shorthand(self):
         return f"{self.num_dice}{self.dice_type}{self.sign}{abs(self.dice_modifier)}"
@@ -117,13 +182,40 @@ class RollResult (Roll):
     def __repr__(self):
         dice_shorthand=self.get_shorthand()
         if self.advantage != 'normal_roll':
-            dice_details=f"{self.dice_rolls[0]} {self.dice_total}{self.sign}{abs(self.dice_modifier)} = {self.total}"
+            dice_details=f"{list(self.dice_rolls)} {self.dice_total}{self.sign}{abs(self.dice_modifier)} = {self.total}"
         else:
             if self.num_dice == 1:
                 dice_details= f"{self.dice_total}{self.sign}{abs(self.dice_modifier)} = {self.total}"
             else:
-                dice_details=f"{self.dice_rolls} {self.dice_total}{self.sign}{abs(self.dice_modifier)} = {self.total}"
+                dice_details=f"{list(self.dice_rolls)} {self.dice_total}{self.sign}{abs(self.dice_modifier)} = {self.total}"
         return f"{dice_shorthand}: {dice_details}"
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    # Memory benchmark: compact results against the previous dict-and-list layout.
+    import random
+    import tracemalloc
+
+    class DictRollResult:
+        def __init__(self, num_dice, dice_type, dice_rolls, dice_modifier, dice_total):
+            self.name = ''
+            self.num_dice = num_dice
+            self.dice_type = dice_type
+            self.dice_modifier = dice_modifier
+            self.advantage = 'normal_roll'
+            self.roll_type = 'custom'
+            self.character_id = None
+            self.dice_total = dice_total
+            self.dice_rolls = dice_rolls
+            self.sign = "+" if dice_modifier >= 0 else "-"
+            self.total = dice_total + dice_modifier
+
+    count = 200_000
+    for num_dice in (1, 4, 20):
+        samples = [[random.randint(1, 6) for _ in range(num_dice)] for _ in range(count)]
+        for result_type in (DictRollResult, RollResult):
+            tracemalloc.start()
+            results = [result_type(num_dice, 'd6', list(rolls), 3, sum(rolls)) for rolls in samples]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{count:,} x {num_dice:>2}d6 {result_type.__name__:<15}: {size / count:6.1f} bytes per result")
+            del results
\ No newline at end of file
@@ -1,4 +1,9 @@
 
+from collections import deque
+
+from domain.models.secondary_index import SecondaryIndex
+
+
 class RollHistory:
     """
     Manages a collection of rolls, providing functionality for adding, retrieving,
@@ -9,23 +14,92 @@ class RollHistory:
     rolls by index, updating specific rolls, removing rolls, clearing the collection,
     and saving/loading rolls to/from a file.
 
-    :ivar rolls: A list storing all the roll objects within the manager.
-    :type rolls: list
+    With a `capacity`, the history works as a ring buffer: once it is full, adding
+    a roll evicts the oldest one, so memory stays flat however long the session
+    runs. Indexes always refer to the rolls still held, oldest first.
+
+    Rolls are also indexed by roll type, character and dice type, so filtered
+    queries cost time proportional to the number of matching rolls. A roll that is
+    changed in place must be passed to `update_roll` to be re-indexed. What each
+    roll contributed to `statistics` is remembered, so such a roll is taken out of
+    the statistics as it was when it was added.
+
+    :ivar rolls: A deque storing all the roll objects within the manager.
+    :type rolls: collections.deque
+    :ivar capacity: The most rolls held at once, or None for no limit.
+    :type capacity: int | None
+    :ivar eviction: What happens to evicted rolls: DROP_OLDEST discards them and
+        SPILL passes them to `spill`, e.g. to append them to a file on disk.
+    :type eviction: str
+    :ivar evicted_count: The number of rolls evicted so far.
+    :type evicted_count: int
+    :ivar journal: Records every added roll so the history outlives the session,
+        e.g. a `RollJournal`, or None.
+    :type journal: RollJournal | None
+    :ivar statistics: Kept up to date with the rolls the history holds, e.g. a
+        `RollStatistics`, or None.
+    :type statistics: RollStatistics | None
     """
-    def __init__(self):
-        self.rolls = []
+    DROP_OLDEST = 'drop_oldest'
+    SPILL = 'spill'
+
+    def __init__(self, capacity=None, eviction=DROP_OLDEST, spill=None, journal=None, statistics=None):
+        """
+        :param capacity: The most rolls held at once, or None for no limit.
+        :type capacity: int | None
+        :param eviction: DROP_OLDEST or SPILL.
+        :type eviction: str
+        :param spill: Called with each evicted roll when `eviction` is SPILL.
+        :type spill: Callable[[Any], None] | None
+        :param journal: Records every added roll, or None.
+        :type journal: RollJournal | None
+        :param statistics: Updated as rolls are added, updated and removed, or None.
+        :type statistics: RollStatistics | None
+        :raises ValueError: If the capacity or eviction policy is not valid.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("Roll history capacity must be at least 1")
+        if eviction not in (RollHistory.DROP_OLDEST, RollHistory.SPILL):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        if eviction == RollHistory.SPILL and spill is None:
+            raise ValueError("The spill eviction policy needs a spill callable")
+        self.capacity = capacity
+        self.eviction = eviction
+        self.spill = spill
+        self.evicted_count = 0
+        self.journal = journal
+        self.statistics = statistics
+        self.rolls = deque()
+        self._sequences = deque()
+        self._index = SecondaryIndex('roll_type', 'character_id', 'dice_type')
+        self._snapshots = {}
 
     def add_roll(self, roll):
         """
         Adds a roll to the list of rolls.
 
         This method appends the provided roll to the `rolls` list, allowing additional
-        roll values to be tracked and stored.
+        roll values to be tracked and stored. If the history is at capacity, the
+        oldest roll is evicted first.
 
         :param roll: The roll value to be added to the list of rolls.
         :type roll: Any
         """
+        if self.capacity is not None and len(self.rolls) >= self.capacity:
+            evicted = self.rolls.popleft()
+            evicted_sequence = self._sequences.popleft()
+            self._index.remove(evicted_sequence)
+            self._remove_statistics(evicted_sequence)
+            self.evicted_count += 1
+            if self.eviction == RollHistory.SPILL:
+                self.spill(evicted)
+        sequence = self._index.next_sequence()
         self.rolls.append(roll)
+        self._sequences.append(sequence)
+        self._index.add(sequence, roll)
+        self._add_statistics(sequence, roll)
+        if self.journal is not None:
+            self.journal.record(roll)
 
     def get_rolls_by_type(self, roll_type=None):
         """
@@ -39,9 +113,29 @@ class RollHistory:
         :rtype: list
         """
         if roll_type is None:
-            return self.rolls
+            return list(self.rolls)
         else:
-            return [roll for roll in self.rolls if roll.roll_type == roll_type]
+            return self._index.get('roll_type', roll_type)
+
+    def get_rolls_by_character(self, character_id):
+        """
+        Retrieves the rolls of one character, oldest first.
+
+        :param character_id: The character's identifier.
+        :type character_id: str
+        :rtype: list
+        """
+        return self._index.get('character_id', character_id)
+
+    def get_rolls_by_dice_type(self, dice_type):
+        """
+        Retrieves the rolls of one dice type (e.g., d6, d20), oldest first.
+
+        :param dice_type: The dice type.
+        :type dice_type: str
+        :rtype: list
+        """
+        return self._index.get('dice_type', dice_type)
 
     def get_roll(self, index):
         """
@@ -90,7 +184,11 @@ class RollHistory:
         :return: This method does not return any value.
         :rtype: None
         """
+        sequence = self._sequences[index]
+        self._remove_statistics(sequence)
+        self._add_statistics(sequence, roll)
         self.rolls[index] = roll
+        self._index.update(sequence, roll)
 
     def remove_roll(self, index):
         """
@@ -102,7 +200,10 @@ class RollHistory:
         :param int index: The zero-based index of the roll to remove.
         :return: None
         """
-        self.rolls.pop(index)
+        self._remove_statistics(self._sequences[index])
+        del self.rolls[index]
+        self._index.remove(self._sequences[index])
+        del self._sequences[index]
 
     def clear(self):
         """
@@ -114,6 +215,22 @@ class RollHistory:
         :return: None
         """
         self.rolls.clear()
+        if self.statistics is not None:
+            self.statistics.clear()
+        if self.journal is not None:
+            self.journal.record_clear()
+        self._sequences.clear()
+        self._index.clear()
+        self._snapshots.clear()
 
     def __len__(self):
-        return len(self.rolls)
\ No newline at end of file
+        return len(self.rolls)
+
+    def _add_statistics(self, sequence, roll):
+        if self.statistics is not None:
+            self._snapshots[sequence] = self.statistics.add(roll)
+
+    def _remove_statistics(self, sequence):
+        snapshot = self._snapshots.pop(sequence, None)
+        if self.statistics is not None and snapshot is not None:
+            self.statistics.remove(snapshot)
\ No newline at end of file
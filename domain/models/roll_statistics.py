@@ -0,0 +1,221 @@
+"""
+roll_statistics.py
+This module keeps live statistics of the rolls in a roll history. Every statistic
+is updated as rolls are added or removed, so querying it never depends on how
+long the session has run.
+Classes:
+    RunningStatistics: Streaming count, mean, variance, extremes and histogram of totals.
+    RollSnapshot: What a roll contributed to the statistics when it was added.
+    RollStatistics: Running statistics of a roll history, overall and per group.
+"""
+
+from collections import Counter, namedtuple
+
+# What a roll contributed to `RollStatistics`: its total, dice type, preset name,
+# faces and, for a single d20, its natural result (None otherwise).
+RollSnapshot = namedtuple('RollSnapshot', ['total', 'dice_type', 'name', 'faces', 'natural'])
+
+
+class RunningStatistics:
+    """
+    Streaming statistics of integer roll totals that support adding and removing
+    values in O(1).
+
+    The count, sum and sum of squares are kept as exact integers, so removing a
+    value undoes adding it exactly and the mean and variance never drift however
+    many updates are made. The minimum and maximum are tracked as totals are added
+    and only looked up again in the histogram, which has one entry per distinct
+    total, when the last occurrence of an extreme is removed.
+
+    :ivar count: The number of totals.
+    :type count: int
+    :ivar histogram: The number of times each total came up.
+    :type histogram: collections.Counter
+    """
+    def __init__(self):
+        self.count = 0
+        self._sum = 0
+        self._sum_of_squares = 0
+        self.histogram = Counter()
+        self._minimum = None
+        self._maximum = None
+
+    def __repr__(self):
+        return (f"RunningStatistics(count={self.count}, mean={self.mean:.3f}, "
+                f"minimum={self.minimum}, maximum={self.maximum})")
+
+    def add(self, total):
+        self.count += 1
+        self._sum += total
+        self._sum_of_squares += total * total
+        self.histogram[total] += 1
+        if self._minimum is None or total < self._minimum:
+            self._minimum = total
+        if self._maximum is None or total > self._maximum:
+            self._maximum = total
+
+    def remove(self, total):
+        """
+        Removes a total that was added before.
+
+        :param total: The total to remove.
+        :type total: int
+        :raises ValueError: If the total was never added.
+        """
+        if not self.histogram[total]:
+            del self.histogram[total]
+            raise ValueError(f"Total {total} is not in the statistics")
+        self.count -= 1
+        self._sum -= total
+        self._sum_of_squares -= total * total
+        self.histogram[total] -= 1
+        if not self.histogram[total]:
+            del self.histogram[total]
+            if total == self._minimum:
+                self._minimum = min(self.histogram, default=None)
+            if total == self._maximum:
+                self._maximum = max(self.histogram, default=None)
+
+    @property
+    def mean(self):
+        return self._sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        """
+        The sample variance of the totals, or 0.0 for fewer than two totals.
+
+        :rtype: float
+        """
+        if self.count < 2:
+            return 0.0
+        return (self.count * self._sum_of_squares - self._sum * self._sum) / (self.count * (self.count - 1))
+
+    @property
+    def minimum(self):
+        return self._minimum
+
+    @property
+    def maximum(self):
+        return self._maximum
+
+
+class RollStatistics:
+    """
+    Running statistics of the roll results in a roll history.
+
+    Attached to a `RollHistory`, it is updated on every add, update, removal and
+    eviction, so it always describes the rolls the history holds. Totals are
+    tracked overall, per dice type and per preset name; natural 1s and 20s are
+    counted for single d20 rolls, and the individual faces rolled are counted per
+    dice type.
+
+    :ivar overall: The statistics of every roll total.
+    :type overall: RunningStatistics
+    :ivar by_dice_type: The statistics of the totals of each dice type.
+    :type by_dice_type: dict[str, RunningStatistics]
+    :ivar by_preset: The statistics of the totals of each named preset.
+    :type by_preset: dict[str, RunningStatistics]
+    :ivar face_counts: The number of times each face came up, per dice type.
+    :type face_counts: dict[str, collections.Counter]
+    :ivar natural_ones: The number of single d20 rolls that came up 1.
+    :type natural_ones: int
+    :ivar natural_twenties: The number of single d20 rolls that came up 20.
+    :type natural_twenties: int
+    """
+    def __init__(self):
+        self.clear()
+
+    def add(self, roll):
+        """
+        Adds a roll result to the statistics.
+
+        :param roll: The roll result.
+        :type roll: RollResult
+        :return: What the roll contributed, to be passed to `remove` if the roll
+            may be changed in place before it is removed.
+        :rtype: RollSnapshot
+        """
+        snapshot = RollStatistics.snapshot(roll)
+        self._update(snapshot, 1)
+        return snapshot
+
+    def remove(self, roll):
+        """
+        Removes a roll result that was added before.
+
+        :param roll: The roll result, or the snapshot `add` returned for it.
+        :type roll: RollResult | RollSnapshot
+        """
+        self._update(roll if isinstance(roll, RollSnapshot) else RollStatistics.snapshot(roll), -1)
+
+    @staticmethod
+    def snapshot(roll):
+        """
+        Returns what a roll result contributes to the statistics as it is now.
+
+        :param roll: The roll result.
+        :type roll: RollResult
+        :rtype: RollSnapshot
+        """
+        natural = roll.dice_total if int(roll.num_dice) == 1 and roll.dice_type == 'd20' else None
+        return RollSnapshot(roll.total, roll.dice_type, roll.name, roll.dice_rolls[:], natural)
+
+    def clear(self):
+        self.overall = RunningStatistics()
+        self.by_dice_type = {}
+        self.by_preset = {}
+        self.face_counts = {}
+        self.natural_ones = 0
+        self.natural_twenties = 0
+
+    def get_statistics(self, dice_type=None, preset=None):
+        """
+        Returns the statistics of the totals of one dice type or preset, or of
+        every roll if neither is given.
+
+        :param dice_type: The dice type (e.g., d6, d20).
+        :type dice_type: str | None
+        :param preset: The preset name.
+        :type preset: str | None
+        :rtype: RunningStatistics
+        """
+        if dice_type is not None:
+            return self.by_dice_type.get(dice_type, RunningStatistics())
+        if preset is not None:
+            return self.by_preset.get(preset, RunningStatistics())
+        return self.overall
+
+    def _update(self, snapshot, sign):
+        total = snapshot.total
+        RollStatistics._update_statistics(self.overall, total, sign)
+        RollStatistics._update_group(self.by_dice_type, snapshot.dice_type, total, sign)
+        if snapshot.name:
+            RollStatistics._update_group(self.by_preset, snapshot.name, total, sign)
+
+        face_counts = self.face_counts.setdefault(snapshot.dice_type, Counter())
+        for face in snapshot.faces:
+            face_counts[face] += sign
+            if not face_counts[face]:
+                del face_counts[face]
+        if not face_counts:
+            del self.face_counts[snapshot.dice_type]
+
+        if snapshot.natural == 1:
+            self.natural_ones += sign
+        elif snapshot.natural == 20:
+            self.natural_twenties += sign
+
+    @staticmethod
+    def _update_group(groups, key, total, sign):
+        statistics = groups.setdefault(key, RunningStatistics())
+        RollStatistics._update_statistics(statistics, total, sign)
+        if not statistics.count:
+            del groups[key]
+
+    @staticmethod
+    def _update_statistics(statistics, total, sign):
+        if sign > 0:
+            statistics.add(total)
+        else:
+            statistics.remove(total)
@@ -0,0 +1,110 @@
+"""
+secondary_index.py
+This module maintains secondary indexes over collections of rolls, so filtered
+queries such as "all presets of this character" cost time proportional to the
+number of matches instead of a scan of the whole collection.
+Classes:
+    SecondaryIndex: Buckets entries by the values of some of their attributes.
+"""
+
+from itertools import count
+
+
+class SecondaryIndex:
+    """
+    Indexes entries by the values of some of their attributes.
+
+    Every entry is identified by a sequence number handed out by `next_sequence`,
+    which also fixes its position among the entries of a bucket. The keys an entry
+    was indexed under are remembered, so an entry can be re-indexed after it has
+    been changed in place.
+
+    Buckets are insertion-ordered dicts, so adding and removing entries is O(1).
+    Re-indexing an entry into a bucket that already holds newer entries marks the
+    bucket as unsorted, and it is sorted again on the next query.
+
+    :ivar fields: The names of the indexed attributes.
+    :type fields: tuple[str, ...]
+    """
+    def __init__(self, *fields):
+        self.fields = fields
+        self._sequence = count()
+        self.clear()
+
+    def next_sequence(self):
+        return next(self._sequence)
+
+    def add(self, sequence, entry):
+        """
+        Indexes an entry under the current values of its indexed attributes.
+
+        :param sequence: The entry's sequence number.
+        :type sequence: int
+        :param entry: The entry to index.
+        :type entry: Any
+        """
+        keys = tuple(getattr(entry, field, None) for field in self.fields)
+        self._keys[sequence] = keys
+        self._entries[sequence] = entry
+        for field, key in zip(self.fields, keys):
+            bucket = self._buckets[field].setdefault(key, {})
+            if bucket and sequence < next(reversed(bucket)):
+                self._unsorted.add((field, key))
+            bucket[sequence] = None
+
+    def remove(self, sequence):
+        """
+        Removes an entry from the index.
+
+        :param sequence: The entry's sequence number.
+        :type sequence: int
+        """
+        keys = self._keys.pop(sequence)
+        del self._entries[sequence]
+        for field, key in zip(self.fields, keys):
+            bucket = self._buckets[field][key]
+            del bucket[sequence]
+            if not bucket:
+                del self._buckets[field][key]
+                self._unsorted.discard((field, key))
+
+    def update(self, sequence, entry):
+        """
+        Re-indexes an entry, e.g. after it has been replaced or changed in place.
+
+        :param sequence: The entry's sequence number.
+        :type sequence: int
+        :param entry: The new or changed entry.
+        :type entry: Any
+        """
+        self.remove(sequence)
+        self.add(sequence, entry)
+
+    def get(self, field, key):
+        """
+        Returns the entries whose `field` attribute was `key` when they were indexed,
+        in sequence order.
+
+        :param field: One of the indexed attributes.
+        :type field: str
+        :param key: The attribute value to look up.
+        :type key: Any
+        :rtype: list
+        """
+        bucket = self._buckets[field].get(key)
+        if bucket is None:
+            return []
+        if (field, key) in self._unsorted:
+            bucket = self._buckets[field][key] = dict.fromkeys(sorted(bucket))
+            self._unsorted.discard((field, key))
+        entries = self._entries
+        return [entries[sequence] for sequence in bucket]
+
+    def clear(self):
+        self._keys = {}
+        self._entries = {}
+        self._buckets = {field: {} for field in self.fields}
+        self._unsorted = set()
+
+    def __len__(self):
+        return len(self._entries)
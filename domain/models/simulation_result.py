@@ -0,0 +1,207 @@
+from statistics import NormalDist
+
+import numpy as np
+
+
+class SimulationResult:
+    """
+    Represents the outcome of a Monte Carlo simulation of a roll.
+
+    The simulated totals are kept as a histogram of counts for consecutive totals
+    starting at `minimum`, so results from many workers can be merged cheaply and
+    memory does not grow with the number of trials.
+
+    :ivar counts: The number of trials that produced each total, starting at `minimum`.
+    :type counts: numpy.ndarray
+    :ivar minimum: The total counted by the first entry of `counts`.
+    :type minimum: int
+    """
+    # The statistics `confidence_interval` accepts by name.
+    STATISTICS = ("mean", "probability_at_least", "percentile")
+
+    def __init__(self, counts, minimum):
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.minimum = minimum
+
+    def __repr__(self):
+        return f"SimulationResult(trials={self.trials}, mean={self.mean():.3f})"
+
+    @classmethod
+    def from_totals(cls, totals):
+        """
+        Builds a result from an array of simulated totals.
+
+        :param totals: The simulated totals.
+        :type totals: numpy.ndarray
+        :rtype: SimulationResult
+        """
+        minimum = int(totals.min())
+        return cls(np.bincount(totals - minimum), minimum)
+
+    @classmethod
+    def from_batches(cls, batches):
+        """
+        Builds a result from a stream of (totals, rolls) chunks, such as
+        `DiceRollService.iter_batches`, holding only one chunk at a time.
+
+        :param batches: An iterable of (totals, rolls) chunks.
+        :type batches: Iterable[tuple[numpy.ndarray, numpy.ndarray]]
+        :rtype: SimulationResult
+        """
+        result = None
+        for totals, _ in batches:
+            chunk = cls.from_totals(totals)
+            result = chunk if result is None else result.merge(chunk)
+        return result
+
+    @property
+    def trials(self):
+        return int(self.counts.sum())
+
+    @property
+    def totals(self):
+        """
+        The totals counted by `counts`, in the same order.
+
+        :rtype: numpy.ndarray
+        """
+        return np.arange(self.minimum, self.minimum + len(self.counts))
+
+    def histogram(self):
+        """
+        Returns the histogram as a mapping of total to number of trials, omitting
+        totals that never came up.
+
+        :rtype: dict[int, int]
+        """
+        return {total: count for total, count in zip(self.totals.tolist(), self.counts.tolist()) if count}
+
+    def merge(self, other):
+        """
+        Returns a result combining the trials of this result and `other`.
+
+        :param other: Another result for the same roll.
+        :type other: SimulationResult
+        :rtype: SimulationResult
+        """
+        minimum = min(self.minimum, other.minimum)
+        maximum = max(self.minimum + len(self.counts), other.minimum + len(other.counts))
+        counts = np.zeros(maximum - minimum, dtype=np.int64)
+        for result in (self, other):
+            start = result.minimum - minimum
+            counts[start:start + len(result.counts)] += result.counts
+        return SimulationResult(counts, minimum)
+
+    def mean(self):
+        return float(self.counts @ self.totals) / self.trials
+
+    def variance(self):
+        deviations = self.totals - self.mean()
+        return float(self.counts @ (deviations * deviations)) / max(self.trials - 1, 1)
+
+    def mean_confidence_interval(self, confidence=0.95):
+        """
+        Returns a normal-approximation confidence interval for the mean total.
+
+        :param confidence: The confidence level, e.g. 0.95.
+        :type confidence: float
+        :rtype: tuple[float, float]
+        """
+        margin = SimulationResult._z_score(confidence) * (self.variance() / self.trials) ** 0.5
+        return self.mean() - margin, self.mean() + margin
+
+    def probability_at_least(self, total):
+        """
+        Returns the fraction of trials whose total was `total` or more, e.g. meeting a DC.
+
+        :param total: The roll total.
+        :type total: int
+        :rtype: float
+        """
+        return self._count_at_least(total) / self.trials
+
+    def probability_confidence_interval(self, total, confidence=0.95):
+        """
+        Returns a Wilson score confidence interval for `probability_at_least(total)`.
+
+        :param total: The roll total.
+        :type total: int
+        :param confidence: The confidence level, e.g. 0.95.
+        :type confidence: float
+        :rtype: tuple[float, float]
+        """
+        return SimulationResult.wilson_interval(self._count_at_least(total), self.trials, confidence)
+
+    def percentile(self, percent):
+        """
+        Returns the smallest total that at least `percent` percent of trials did not exceed.
+
+        :param percent: The percentile, between 0 and 100.
+        :type percent: float
+        :rtype: int
+        """
+        return self._total_at_rank(percent / 100 * self.trials)
+
+    def percentile_confidence_interval(self, percent, confidence=0.95):
+        """
+        Returns a distribution-free confidence interval for `percentile(percent)`,
+        taken from the order statistics whose ranks bound the percentile.
+
+        :param percent: The percentile, between 0 and 100.
+        :type percent: float
+        :param confidence: The confidence level, e.g. 0.95.
+        :type confidence: float
+        :rtype: tuple[int, int]
+        """
+        proportion = percent / 100
+        margin = SimulationResult._z_score(confidence) * (self.trials * proportion * (1 - proportion)) ** 0.5
+        rank = proportion * self.trials
+        return self._total_at_rank(rank - margin), self._total_at_rank(rank + margin)
+
+    def confidence_interval(self, statistic, confidence=0.95, total=None, percent=None):
+        """
+        Returns the confidence interval of a statistic by name.
+
+        :param statistic: "mean", "probability_at_least" (requires `total`) or
+            "percentile" (requires `percent`).
+        :type statistic: str
+        :param confidence: The confidence level, e.g. 0.95.
+        :type confidence: float
+        :param total: The total for "probability_at_least", e.g. a DC.
+        :type total: int | None
+        :param percent: The percentile for "percentile", between 0 and 100.
+        :type percent: float | None
+        :rtype: tuple[float, float]
+        :raises ValueError: If the statistic is not supported.
+        """
+        match statistic:
+            case "mean":
+                return self.mean_confidence_interval(confidence)
+            case "probability_at_least":
+                return self.probability_confidence_interval(total, confidence)
+            case "percentile":
+                return self.percentile_confidence_interval(percent, confidence)
+            case _:
+                raise ValueError(f"Unsupported statistic: {statistic}")
+
+    @staticmethod
+    def wilson_interval(successes, trials, confidence=0.95):
+        z = SimulationResult._z_score(confidence)
+        proportion = successes / trials
+        denominator = 1 + z * z / trials
+        centre = (proportion + z * z / (2 * trials)) / denominator
+        margin = z * (proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) ** 0.5 / denominator
+        return centre - margin, centre + margin
+
+    def _count_at_least(self, total):
+        index = min(max(total - self.minimum, 0), len(self.counts))
+        return int(self.counts[index:].sum())
+
+    def _total_at_rank(self, rank):
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, max(rank, 1)))
+        return self.minimum + min(index, len(self.counts) - 1)
+
+    @staticmethod
+    def _z_score(confidence):
+        return NormalDist().inv_cdf(0.5 + confidence / 2)
@@ -0,0 +1,189 @@
+import asyncio
+
+from domain.models.dice_expression import compile_expression
+from domain.services.dice_roll_service import DiceRollService
+from domain.services.simulation_service import SimulationService
+
+
+class AsyncDiceRollService:
+    """
+    An asyncio facade over `DiceRollService` for bots and web front ends.
+
+    Small rolls and small batches only take microseconds and run directly on
+    the event loop, where they are cheaper than a round trip to a thread. Rolls
+    and expressions with many dice, larger batches, expression batches, streamed
+    chunks and simulations are sent to an executor so the event loop never blocks
+    on them.
+
+    Use it as an async context manager, or call `aclose`, so the worker processes
+    started by `simulate` are stopped.
+
+    :ivar dice_roll_service: The service that performs the rolls.
+    :type dice_roll_service: DiceRollService
+    :ivar executor: The executor for heavy work, or None for the loop's default
+        thread pool. NumPy releases the GIL for most of a batch.
+    :type executor: concurrent.futures.Executor | None
+    :ivar simulation_service: The service used by `simulate`, created on first use.
+    :type simulation_service: SimulationService | None
+    """
+    # Batches of at most this many dice are rolled on the event loop.
+    INLINE_DICE_LIMIT = 10_000
+    # Single rolls build a Python object per die, about a hundred times the cost of
+    # a batched die, so they are only rolled on the event loop up to this many dice.
+    INLINE_ROLL_DICE_LIMIT = 100
+
+    def __init__(self, dice_roll_service=None, executor=None, simulation_service=None):
+        self.dice_roll_service = DiceRollService() if dice_roll_service is None else dice_roll_service
+        self.executor = executor
+        self.simulation_service = simulation_service
+        self._owns_simulation_service = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def roll(self, num_dice, dice_type, dice_modifier, advantage=0):
+        """
+        Rolls dice once, like `DiceRollService.roll_dice`, in the executor if there
+        are many dice.
+
+        :rtype: RollResult
+        """
+        if num_dice <= AsyncDiceRollService.INLINE_ROLL_DICE_LIMIT:
+            return self.dice_roll_service.roll_dice(num_dice, dice_type, dice_modifier, advantage)
+        return await self._run(self.dice_roll_service.roll_dice, num_dice, dice_type, dice_modifier, advantage)
+
+    async def roll_batch(self, num_dice, dice_type, dice_modifier, advantage=0, trials=1):
+        """
+        Rolls many trials in the executor, like `DiceRollService.roll_batch`.
+
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if num_dice * trials <= AsyncDiceRollService.INLINE_DICE_LIMIT:
+            return self.dice_roll_service.roll_batch(num_dice, dice_type, dice_modifier, advantage, trials)
+        return await self._run(self.dice_roll_service.roll_batch,
+                               num_dice, dice_type, dice_modifier, advantage, trials)
+
+    async def roll_expression(self, expression):
+        """
+        Rolls a dice expression once, like `DiceRollService.roll_expression`, in the
+        executor if it rolls many dice.
+
+        :rtype: ExpressionResult
+        :raises ValueError: If the expression is not valid.
+        """
+        dice = sum(group.count for group in compile_expression(expression).groups)
+        if dice <= AsyncDiceRollService.INLINE_ROLL_DICE_LIMIT:
+            return self.dice_roll_service.roll_expression(expression)
+        return await self._run(self.dice_roll_service.roll_expression, expression)
+
+    async def roll_expression_batch(self, expression, trials=1):
+        """
+        Rolls a dice expression for many trials in the executor.
+
+        :rtype: numpy.ndarray
+        """
+        return await self._run(self.dice_roll_service.roll_expression_batch, expression, trials)
+
+    async def stream_batches(self, num_dice, dice_type, dice_modifier, advantage=0,
+                             chunk_size=DiceRollService.STREAM_CHUNK_SIZE, trials=None):
+        """
+        Asynchronously iterates over `DiceRollService.iter_batches` chunks. Each chunk
+        is rolled in the executor while the event loop keeps running.
+
+        :rtype: AsyncIterator[tuple[numpy.ndarray, numpy.ndarray]]
+        """
+        batches = self.dice_roll_service.iter_batches(num_dice, dice_type, dice_modifier,
+                                                      advantage, chunk_size, trials)
+        while True:
+            batch = await self._run(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+
+    async def stream_rolls(self, num_dice, dice_type, dice_modifier, advantage=0,
+                           count=None, chunk_size=DiceRollService.STREAM_CHUNK_SIZE):
+        """
+        Asynchronously iterates over `RollResult`s, rolling a chunk at a time in the
+        executor like `DiceRollService.iter_rolls`.
+
+        :rtype: AsyncIterator[RollResult]
+        """
+        rolls = self.dice_roll_service.iter_rolls(num_dice, dice_type, dice_modifier,
+                                                  advantage, count, chunk_size)
+        while True:
+            chunk = await self._run(lambda: [roll for _, roll in zip(range(chunk_size), rolls)])
+            for roll in chunk:
+                yield roll
+            if len(chunk) < chunk_size:
+                return
+
+    async def simulate(self, roll, trials):
+        """
+        Runs a Monte Carlo simulation, like `SimulationService.simulate`, without
+        blocking the event loop.
+
+        :rtype: SimulationResult
+        """
+        if self.simulation_service is None:
+            self.simulation_service = SimulationService()
+            self._owns_simulation_service = True
+        return await self._run(self.simulation_service.simulate, roll, trials)
+
+    async def aclose(self):
+        """
+        Stops the worker processes of the simulation service created by `simulate`,
+        in the executor since it waits for them to exit. A simulation service passed
+        to the constructor is left to its owner.
+        """
+        if self._owns_simulation_service:
+            simulation_service, self.simulation_service = self.simulation_service, None
+            self._owns_simulation_service = False
+            await self._run(simulation_service.shutdown)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+
+if __name__ == "__main__":
+    # Measures throughput and event loop latency with thousands of concurrent callers.
+    import time
+
+    from domain.models.roll import Roll
+
+    async def measure_loop_lag(stop, lags):
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def benchmark(callers, make_call):
+        stop, lags = asyncio.Event(), []
+        monitor = asyncio.create_task(measure_loop_lag(stop, lags))
+        async with AsyncDiceRollService() as service:
+            start = time.perf_counter()
+            await asyncio.gather(*(make_call(service) for _ in range(callers)))
+            seconds = time.perf_counter() - start
+        stop.set()
+        await monitor
+        return callers / seconds, max(lags, default=0.0)
+
+    async def main():
+        for name, callers, make_call in [
+            ("roll", 1_000, lambda service: service.roll(3, "d6", 2)),
+            ("roll", 10_000, lambda service: service.roll(3, "d6", 2)),
+            ("roll 999d6", 1_000, lambda service: service.roll(999, "d6", 2)),
+            ("roll 5000d6kh1", 100, lambda service: service.roll_expression("5000d6kh1")),
+            ("roll_batch x1000", 1_000, lambda service: service.roll_batch(3, "d6", 2, trials=1000)),
+            ("roll_batch x1000", 10_000, lambda service: service.roll_batch(3, "d6", 2, trials=1000)),
+            ("roll_batch x100000", 100, lambda service: service.roll_batch(3, "d6", 2, trials=100_000)),
+            ("roll_batch x100000", 1_000, lambda service: service.roll_batch(3, "d6", 2, trials=100_000)),
+            ("simulate x100000", 10, lambda service: service.simulate(Roll(3, "d6", 2), 100_000)),
+        ]:
+            calls_per_second, lag = await benchmark(callers, make_call)
+            print(f"{callers:>6} callers, {name:<18}: {calls_per_second:>10,.0f} calls/s, "
+                  f"max loop lag {lag * 1000:.1f} ms")
+
+    asyncio.run(main())
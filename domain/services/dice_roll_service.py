@@ -1,26 +1,204 @@
+import threading
 
 from domain.models.roll import RollResult
 from domain.models.dice import Die, DiceRoller
+from domain.models.dice_expression import compile_expression
+from domain.models.rng import default_random_source
 
 class DiceRollService:
-    def __init__(self):
-        self.roller = DiceRoller()
+    """
+    Rolls dice for the application and for batch or streaming callers.
+
+    The service is safe to share between threads and is reentrant: every call
+    rolls with its own `DiceRoller`, and every thread rolls with its own random
+    stream spawned from the service's random source, so concurrent callers
+    never share mutable dice state or contend on one generator. The default
+    interpreter-wide source is the exception: it is used directly, so that
+    `random.seed()` keeps applying to every roll. CPython's generator is safe to
+    share between threads.
+
+    :ivar rng: The random source that per-thread streams are spawned from.
+    :type rng: RandomSource
+    """
+    # Dice counts at or above this are rolled by sampling face counts instead of
+    # rolling each die individually.
+    MULTINOMIAL_THRESHOLD = 1000
+    # Trials rolled per chunk by the streaming iterators.
+    STREAM_CHUNK_SIZE = 10_000
+
+    def __init__(self, rng=None):
+        """
+        :param rng: The random source used for every roll made by this service, e.g.
+            from `create_random_source`. Defaults to the interpreter-wide generator.
+        :type rng: RandomSource | None
+        """
+        self.rng = default_random_source if rng is None else rng
+        self._thread_state = threading.local()
+        self._spawn_lock = threading.Lock()
 
     @staticmethod
     def is_d20_roll(num_dice, dice_type):
         return num_dice == 1 and dice_type == 'd20'
 
-    def roll_dice(self, num_dice, dice_type, dice_modifier, advantage):
-        self.roller.clear_dice()
+    def get_roller(self):
+        """
+        Returns a new dice roller that rolls with the calling thread's random stream,
+        or with the interpreter-wide generator for the default source.
+
+        :rtype: DiceRoller
+        """
+        if self.rng is default_random_source:
+            return DiceRoller(self.rng)
+        rng = getattr(self._thread_state, 'rng', None)
+        if rng is None:
+            with self._spawn_lock:
+                rng = self.rng.spawn(1)[0]
+            self._thread_state.rng = rng
+        return DiceRoller(rng)
+
+    def roll_dice(self, num_dice, dice_type, dice_modifier, advantage, name=''):
+        roller = self.get_roller()
 
         if DiceRollService.is_d20_roll(num_dice, dice_type):
-            rolls = self.roller.d20_roll(advantage)
-            dice_total = rolls[1]
-            roll_result = RollResult(num_dice, dice_type, rolls, dice_modifier, dice_total)
+            dice_rolls, dice_total = roller.d20_roll(advantage)
+            roll_result = RollResult(num_dice, dice_type, dice_rolls, dice_modifier, dice_total)
+        elif num_dice >= DiceRollService.MULTINOMIAL_THRESHOLD:
+            dice_rolls, dice_total = roller.multinomial_roll(dice_type, num_dice)
+            roll_result = RollResult(num_dice, dice_type, dice_rolls, dice_modifier, dice_total)
         else:
             for _ in range(num_dice):
-                self.roller.add_dice(Die(dice_type))
-                dice_total = self.roller.total_roll()
-                roll_result = RollResult(num_dice, dice_type, dice_total[0], dice_modifier, dice_total[1])
+                roller.add_dice(Die(dice_type, rng=roller.rng))
+            dice_rolls, dice_total = roller.total_roll()
+            roll_result = RollResult(num_dice, dice_type, dice_rolls, dice_modifier, dice_total)
+
+        roll_result.name = name
+        return roll_result
+
+    def roll_batch(self, num_dice, dice_type, dice_modifier, advantage=0, trials=1):
+        """
+        Rolls the same dice configuration for many trials at once.
+
+        This is the batched counterpart of `roll_dice` and follows the same advantage
+        rules: a single d20 rolled with advantage (1) or disadvantage (2) keeps the
+        higher or lower of two d20s. The returned totals include the modifier.
+
+        :param num_dice: The number of dice rolled in each trial.
+        :type num_dice: int
+        :param dice_type: The type of dice being rolled (e.g., d6, d20).
+        :type dice_type: str
+        :param dice_modifier: The modifier added to every trial total.
+        :type dice_modifier: int
+        :param advantage: 1 for advantage, 2 for disadvantage, anything else for normal.
+        :type advantage: int
+        :param trials: The number of trials to roll.
+        :type trials: int
+        :return: The per-trial totals and the raw trials x dice matrix of rolls.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if DiceRollService.is_d20_roll(num_dice, dice_type) and advantage in (1, 2):
+            _, dice_rolls = self.get_roller().roll_batch(dice_type, 2, trials)
+            if advantage == 1:
+                dice_totals = dice_rolls.max(axis=1).astype('int64')
+            else:
+                dice_totals = dice_rolls.min(axis=1).astype('int64')
+        else:
+            dice_totals, dice_rolls = self.get_roller().roll_batch(dice_type, num_dice, trials)
+
+        return dice_totals + dice_modifier, dice_rolls
+
+    def iter_batches(self, num_dice, dice_type, dice_modifier, advantage=0,
+                     chunk_size=STREAM_CHUNK_SIZE, trials=None):
+        """
+        Lazily yields `roll_batch` results of at most `chunk_size` trials each, so
+        any number of trials can be processed with bounded memory.
+
+        :param chunk_size: The number of trials per chunk.
+        :type chunk_size: int
+        :param trials: The total number of trials, or None to yield chunks forever.
+        :type trials: int | None
+        :return: An iterator of (totals, rolls) chunks, as returned by `roll_batch`.
+        :rtype: Iterator[tuple[numpy.ndarray, numpy.ndarray]]
+        """
+        remaining = trials
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            yield self.roll_batch(num_dice, dice_type, dice_modifier, advantage, size)
+            if remaining is not None:
+                remaining -= size
+
+    def iter_rolls(self, num_dice, dice_type, dice_modifier, advantage=0,
+                   count=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Lazily yields `RollResult`s with the same contents as `roll_dice`, rolled in
+        chunks by the batched engine. Only one chunk is held in memory at a time.
+
+        :param count: The number of results, or None to yield results forever.
+        :type count: int | None
+        :param chunk_size: The number of results rolled per chunk.
+        :type chunk_size: int
+        :rtype: Iterator[RollResult]
+        """
+        for dice_totals, dice_rolls in self.iter_batches(num_dice, dice_type, dice_modifier,
+                                                         advantage, chunk_size, count):
+            for total, rolls in zip((dice_totals - dice_modifier).tolist(), dice_rolls.tolist()):
+                yield RollResult(num_dice, dice_type, rolls, dice_modifier, total)
+
+    def roll_pool(self, num_dice, dice_type, dice_modifier, keep, keep_highest=True):
+        """
+        Rolls a pool of dice and keeps the highest (or lowest) `keep` of them, e.g.
+        4d6 drop lowest (keep 3) or elven accuracy (3d20 keep highest 1).
+
+        :param num_dice: The number of dice in the pool.
+        :type num_dice: int
+        :param dice_type: The type of dice being rolled (e.g., d6, d20).
+        :type dice_type: str
+        :param dice_modifier: The modifier added to the kept total.
+        :type dice_modifier: int
+        :param keep: The number of dice kept. Dropping N dice is keeping num_dice - N.
+        :type keep: int
+        :param keep_highest: True to keep the highest dice, False to keep the lowest.
+        :type keep_highest: bool
+        :return: The result, listing every die rolled and totalling only the kept dice.
+        :rtype: RollResult
+        :raises ValueError: If `keep` is negative.
+        """
+        dice_rolls, dice_total = self.get_roller().keep_roll(dice_type, num_dice, keep, keep_highest)
+        return RollResult(num_dice, dice_type, dice_rolls, dice_modifier, dice_total)
+
+    def roll_pool_batch(self, num_dice, dice_type, dice_modifier, keep, keep_highest=True, trials=1):
+        """
+        Batched counterpart of `roll_pool`.
+
+        :return: The per-trial kept totals including the modifier, and the raw
+            trials x dice matrix of rolls.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        :raises ValueError: If `keep` is negative.
+        """
+        dice_totals, dice_rolls = self.get_roller().keep_batch(dice_type, num_dice, keep, keep_highest, trials)
+        return dice_totals + dice_modifier, dice_rolls
+
+    def roll_expression(self, expression):
+        """
+        Rolls a dice expression such as "2d6 + 3" or "4d6dl1" once.
+
+        :param expression: The dice expression to roll.
+        :type expression: str
+        :rtype: ExpressionResult
+        :raises ValueError: If the expression is not valid.
+        """
+        return compile_expression(expression).roll(self.get_roller())
+
+    def roll_expression_batch(self, expression, trials=1):
+        """
+        Rolls a dice expression for many trials at once.
+
+        :param expression: The dice expression to roll.
+        :type expression: str
+        :param trials: The number of trials to roll.
+        :type trials: int
+        :return: The total of each trial.
+        :rtype: numpy.ndarray
+        :raises ValueError: If the expression is not valid.
+        """
+        return compile_expression(expression).roll_batch(trials, self.get_roller())
 
-        return roll_result
\ No newline at end of file
@@ -0,0 +1,141 @@
+import numpy as np
+
+from domain.models.dice import Die
+from domain.models.fairness_result import FairnessResult
+from storage.roll_journal import RollJournal
+
+
+class FairnessAuditService:
+    """
+    Audits whether dice rolled fairly, per dice type, from a roll history, its
+    running statistics or a roll journal.
+
+    Every audit is a single pass that only keeps one array of face counts per dice
+    type, so memory does not grow with the number of rolls. Journal faces are
+    gathered per dice type into a bounded buffer and counted a chunk at a time with
+    NumPy, so multi-million-roll journals are audited in seconds.
+    """
+    # Bytes of journal faces gathered per dice type before they are counted.
+    JOURNAL_CHUNK_SIZE = 1 << 20
+
+    def audit_rolls(self, rolls):
+        """
+        Audits the individual dice of roll results, e.g. `RollHistory.rolls`.
+
+        :param rolls: The roll results to audit.
+        :type rolls: Iterable[RollResult]
+        :return: The audit of each dice type that was rolled.
+        :rtype: dict[str, FairnessResult]
+        """
+        counts = {}
+        for roll in rolls:
+            sides = Die.dice_types.get(roll.dice_type)
+            if sides is None:
+                continue
+            face_counts = counts.get(roll.dice_type)
+            if face_counts is None:
+                face_counts = counts[roll.dice_type] = [0] * (sides + 2)
+            for face in roll.dice_rolls:
+                face_counts[face if 0 < face <= sides else -1] += 1
+        return {dice_type: FairnessResult(dice_type, face_counts[1:-1], face_counts[-1])
+                for dice_type, face_counts in counts.items()}
+
+    def audit_history(self, roll_history):
+        """
+        Audits the rolls held by a roll history. A history with attached
+        `RollStatistics` is audited from its face counts without visiting any roll.
+
+        :param roll_history: The roll history to audit.
+        :type roll_history: RollHistory
+        :rtype: dict[str, FairnessResult]
+        """
+        statistics = getattr(roll_history, 'statistics', None)
+        if statistics is not None:
+            return self.audit_statistics(statistics)
+        return self.audit_rolls(roll_history.get_rolls_by_type())
+
+    def audit_statistics(self, statistics):
+        """
+        Audits the face counts kept by `RollStatistics`.
+
+        :param statistics: The running statistics of a roll history.
+        :type statistics: RollStatistics
+        :rtype: dict[str, FairnessResult]
+        """
+        results = {}
+        for dice_type, face_counts in statistics.face_counts.items():
+            sides = Die.dice_types.get(dice_type)
+            if sides is None:
+                continue
+            counts = [face_counts.get(face, 0) for face in range(1, sides + 1)]
+            invalid_faces = sum(count for face, count in face_counts.items() if not 0 < face <= sides)
+            results[dice_type] = FairnessResult(dice_type, counts, invalid_faces)
+        return results
+
+    def audit_journal(self, filename='data/roll_journal.bin'):
+        """
+        Audits every roll recorded in a roll journal.
+
+        :param filename: The path of the journal file.
+        :type filename: str
+        :rtype: dict[str, FairnessResult]
+        :raises ValueError: If the file is not a roll journal.
+        """
+        dice_types = {sides: dice_type for dice_type, sides in Die.dice_types.items()}
+        buffers, counts = {}, {}
+
+        def count_faces(sides, buffer):
+            faces = np.frombuffer(buffer, dtype='<u2')
+            face_counts = np.bincount(faces, minlength=sides + 1)
+            valid = counts.setdefault(sides, np.zeros(sides + 2, dtype=np.int64))
+            valid[1:sides + 1] += face_counts[1:sides + 1]
+            valid[-1] += face_counts[sides + 1:].sum() + face_counts[0]
+            del faces
+            buffer.clear()
+
+        for sides, faces in RollJournal.iter_faces(filename):
+            if sides not in dice_types:
+                continue
+            buffer = buffers.get(sides)
+            if buffer is None:
+                buffer = buffers[sides] = bytearray()
+            buffer += faces
+            if len(buffer) >= FairnessAuditService.JOURNAL_CHUNK_SIZE:
+                count_faces(sides, buffer)
+        for sides, buffer in buffers.items():
+            if buffer:
+                count_faces(sides, buffer)
+
+        return {dice_types[sides]: FairnessResult(dice_types[sides], face_counts[1:-1], int(face_counts[-1]))
+                for sides, face_counts in counts.items()}
+
+
+if __name__ == '__main__':
+    # Audits a multi-million-die journal from a fair roller and a biased d20.
+    import os
+    import tempfile
+    import time
+
+    from domain.models.roll import RollResult
+
+    generator = np.random.default_rng()
+    service = FairnessAuditService()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'roll_journal.bin')
+        with RollJournal(filename) as journal:
+            for dice_type, num_dice in [('d20', 1), ('d6', 4), ('d8', 2)]:
+                for faces in generator.integers(1, Die.dice_types[dice_type] + 1, (400_000, num_dice)).tolist():
+                    journal.record(RollResult(num_dice, dice_type, faces, 0, sum(faces)))
+        dice = sum(result.rolls for result in service.audit_journal(filename).values())
+
+        start = time.perf_counter()
+        results = service.audit_journal(filename)
+        seconds = time.perf_counter() - start
+        print(f"Audited {dice:,} dice from {os.path.getsize(filename) / 1e6:.0f} MB in {seconds:.2f} s")
+        for result in results.values():
+            print(f"  {result}, fair: {result.is_fair()}")
+
+    biased = [RollResult(1, 'd20', [face], 0, face)
+              for face in generator.choice(np.arange(1, 21), 50_000, p=[0.04] + [0.05] * 18 + [0.06]).tolist()]
+    result = service.audit_rolls(biased)['d20']
+    print(f"Biased d20: {result}, fair: {result.is_fair()}")
@@ -1,24 +1,33 @@
+from domain.models.secondary_index import SecondaryIndex
 from storage.preset_repository import PresetRepository
 
 class PresetService:
     def __init__(self):
         self.presets = []
+        self._sequences = []
+        self._index = SecondaryIndex('roll_type', 'character_id', 'dice_type')
 
     def add_preset(self, roll):
+        sequence = self._index.next_sequence()
         self.presets.append(roll)
+        self._sequences.append(sequence)
+        self._index.add(sequence, roll)
 
     def get_presets_by_type(self, roll_type=None):
         if roll_type is None:
             return self.presets
         else:
-            return [preset for preset in self.presets if preset.roll_type == roll_type]
+            return self._index.get('roll_type', roll_type)
 
     def get_presets_by_character(self, character_id):
-        return [preset for preset in self.presets if preset.character_id == character_id]
+        return self._index.get('character_id', character_id)
+
+    def get_presets_by_dice_type(self, dice_type):
+        return self._index.get('dice_type', dice_type)
 
     def add_character_default_presets(self, character):
         for preset in character.default_presets.rolls:
-            self.presets.append(preset)
+            self.add_preset(preset)
 
     def get_preset(self, index):
         try:
@@ -31,15 +40,67 @@ class PresetService:
 
     def update_preset(self, roll, index):
         self.presets[index] = roll
+        self._index.update(self._sequences[index], roll)
 
     def remove_preset(self, index):
         del self.presets[index]
+        self._index.remove(self._sequences[index])
+        del self._sequences[index]
 
     def clear_presets(self):
         self.presets.clear()
+        self._sequences.clear()
+        self._index.clear()
 
     def save_presets(self, filename='data/presets.json'):
         PresetRepository.save_presets_to_file(self.presets, filename)
 
     def load_presets(self, filename='data/presets.json'):
-       self.presets = PresetRepository.load_presets_from_file(filename)
\ No newline at end of file
+        self.clear_presets()
+        for preset in PresetRepository.load_presets_from_file(filename):
+            self.add_preset(preset)
+
+
+if __name__ == '__main__':
+    # Benchmarks filtered queries on a large preset library against a full scan.
+    import random
+    import time
+
+    from domain.models.dice import Die
+    from domain.models.roll import Roll
+
+    service = PresetService()
+    dice_types = Die.get_dice_types()
+    for number in range(50_000):
+        service.add_preset(Roll(random.randint(1, 10), random.choice(dice_types), random.randint(-5, 5),
+                                name=f'Preset {number}', roll_type=random.choice(['custom', 'attack', 'skill']),
+                                character_id=f'character-{number % 500}'))
+
+    queries = 1_000
+    for name, query, scan in [
+        ("by character", lambda: service.get_presets_by_character('character-7'),
+         lambda: [preset for preset in service.presets if preset.character_id == 'character-7']),
+        ("by roll type", lambda: service.get_presets_by_type('attack'),
+         lambda: [preset for preset in service.presets if preset.roll_type == 'attack']),
+        ("by dice type", lambda: service.get_presets_by_dice_type('d20'),
+         lambda: [preset for preset in service.presets if preset.dice_type == 'd20']),
+    ]:
+        assert query() == scan()
+        timings = []
+        for function in (query, scan):
+            start = time.perf_counter()
+            for _ in range(queries):
+                function()
+            timings.append((time.perf_counter() - start) / queries * 1e6)
+        print(f"{len(service.presets):,} presets, {name:<12} ({len(query()):>6,} matches): "
+              f"index {timings[0]:8.1f} us, scan {timings[1]:8.1f} us")
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        index = random.randrange(len(service.presets))
+        preset = service.get_preset(index)
+        preset.character_id = f'character-{random.randrange(500)}'
+        service.update_preset(preset, index)
+    print(f"update_preset with re-indexing: {(time.perf_counter() - start) / queries * 1e6:.1f} us")
+    assert service.get_presets_by_character('character-7') == \
+        [preset for preset in service.presets if preset.character_id == 'character-7']
\ No newline at end of file
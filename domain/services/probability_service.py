@@ -0,0 +1,116 @@
+from functools import lru_cache
+
+from domain.models.dice_expression import compile_expression
+from domain.models.distribution import RollDistribution
+from domain.models.roll import Roll
+from domain.services.dice_roll_service import DiceRollService
+
+class ProbabilityService:
+    """
+    Provides exact roll distributions for presets and ad-hoc rolls.
+
+    Distributions are cached in a bounded LRU cache keyed on the normalized dice
+    pool (dice count, dice type and effective advantage). The modifier is applied
+    afterwards by shifting the cached distribution, so presets that only differ by
+    their modifier share one cache entry.
+
+    :ivar cache_size: The maximum number of dice pools kept in the cache.
+    :type cache_size: int
+    """
+    CACHE_SIZE = 256
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self._pool_distribution = lru_cache(maxsize=cache_size)(self._compute_pool_distribution)
+        self._keep_distribution = lru_cache(maxsize=cache_size)(RollDistribution.for_keep)
+        self._expression_distribution = lru_cache(maxsize=cache_size)(self._compute_expression_distribution)
+
+    @staticmethod
+    def normalize(num_dice, dice_type, advantage):
+        """
+        Returns the cache key for a dice pool. Advantage is dropped for rolls it
+        does not apply to, matching `DiceRollService.roll_dice`.
+
+        :rtype: tuple[int, str, int]
+        """
+        num_dice = int(num_dice)
+        advantage = Roll.get_advantage_mode(advantage)
+        if not DiceRollService.is_d20_roll(num_dice, dice_type):
+            advantage = 0
+        return num_dice, dice_type, advantage
+
+    def get_distribution(self, num_dice, dice_type, dice_modifier=0, advantage=0):
+        """
+        Returns the exact distribution of a roll total.
+
+        :param num_dice: The number of dice rolled.
+        :type num_dice: int
+        :param dice_type: The type of dice being rolled (e.g., d6, d20).
+        :type dice_type: str
+        :param dice_modifier: The modifier added to the total.
+        :type dice_modifier: int
+        :param advantage: The advantage setting, as a string or an integer mode.
+        :type advantage: str | int
+        :rtype: RollDistribution
+        """
+        pool = self.normalize(num_dice, dice_type, advantage)
+        return self._pool_distribution(*pool).shift(int(dice_modifier))
+
+    def get_roll_distribution(self, roll):
+        """
+        Returns the exact distribution of a `Roll`, such as a preset.
+
+        :param roll: The roll configuration.
+        :type roll: Roll
+        :rtype: RollDistribution
+        """
+        return self.get_distribution(roll.num_dice, roll.dice_type, roll.dice_modifier, roll.advantage)
+
+    def get_keep_distribution(self, num_dice, dice_type, keep, keep_highest=True, dice_modifier=0):
+        """
+        Returns the exact distribution of a keep-highest/keep-lowest dice pool, such
+        as 4d6 drop lowest (keep 3) or 3d20 keep highest 1.
+
+        :param num_dice: The number of dice in the pool.
+        :type num_dice: int
+        :param dice_type: The type of dice being rolled (e.g., d6, d20).
+        :type dice_type: str
+        :param keep: The number of dice kept.
+        :type keep: int
+        :param keep_highest: True to keep the highest dice, False to keep the lowest.
+        :type keep_highest: bool
+        :param dice_modifier: The modifier added to the kept total.
+        :type dice_modifier: int
+        :rtype: RollDistribution
+        """
+        distribution = self._keep_distribution(dice_type, int(num_dice), int(keep), bool(keep_highest))
+        return distribution.shift(int(dice_modifier))
+
+    def get_expression_distribution(self, expression):
+        """
+        Returns the exact distribution of a dice expression, including exploding,
+        reroll and minimum-face rules, e.g. "2d6ro<3 + 4" for a Great Weapon
+        Fighting greatsword.
+
+        :param expression: The dice expression.
+        :type expression: str
+        :rtype: RollDistribution
+        :raises ValueError: If the expression is not valid.
+        """
+        return self._expression_distribution(expression)
+
+    def cache_info(self):
+        return self._pool_distribution.cache_info()
+
+    def clear_cache(self):
+        self._pool_distribution.cache_clear()
+        self._keep_distribution.cache_clear()
+        self._expression_distribution.cache_clear()
+
+    @staticmethod
+    def _compute_expression_distribution(expression):
+        return compile_expression(expression).distribution()
+
+    @staticmethod
+    def _compute_pool_distribution(num_dice, dice_type, advantage):
+        return RollDistribution.for_roll(num_dice, dice_type, 0, advantage)
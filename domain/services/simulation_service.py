@@ -0,0 +1,212 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from domain.models.rng import NumpyRandomSource
+from domain.models.roll import Roll
+from domain.models.simulation_result import SimulationResult
+from domain.services.dice_roll_service import DiceRollService
+
+
+def _roll_totals(service, roll, trials):
+    if isinstance(roll, str):
+        return service.roll_expression_batch(roll, trials)
+    return service.roll_batch(*roll, trials=trials)[0]
+
+
+def _simulate_trials(roll, trials, seed_sequence, chunk_size):
+    """
+    Simulates `trials` rolls with an independent random stream. Runs inside the
+    worker processes, so it only takes and returns picklable values.
+    """
+    service = DiceRollService(NumpyRandomSource(seed_sequence))
+    result = None
+    while trials > 0:
+        chunk = SimulationResult.from_totals(_roll_totals(service, roll, min(trials, chunk_size)))
+        result = chunk if result is None else result.merge(chunk)
+        trials -= chunk_size
+    return result
+
+
+class SimulationService:
+    """
+    Runs Monte Carlo simulations of rolls across a pool of worker processes.
+
+    Each simulation splits its trials evenly between the workers. Every worker
+    rolls with its own random stream spawned from the service's seed sequence and
+    returns a histogram, and the histograms are merged into one SimulationResult.
+    Rolls can be given as a `Roll` (such as a preset) or as a dice expression.
+
+    :ivar workers: The number of worker processes.
+    :type workers: int
+    :ivar seed_sequence: The seed sequence worker streams are spawned from. Services
+        created with the same seed and number of workers give identical results.
+    :type seed_sequence: numpy.random.SeedSequence
+    """
+    # Trials rolled per array operation inside a worker, which bounds worker memory.
+    CHUNK_SIZE = 100_000
+    # Trials rolled by each worker between convergence checks of simulate_until.
+    ADAPTIVE_CHUNK_SIZE = 10_000
+    MAX_TRIALS = 10_000_000
+
+    def __init__(self, workers=None, seed=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    @staticmethod
+    def describe_roll(roll):
+        """
+        Converts a roll into the picklable form sent to the workers.
+
+        :param roll: A `Roll` or a dice expression string.
+        :type roll: Roll | str
+        :rtype: tuple[int, str, int, int] | str
+        """
+        if isinstance(roll, str):
+            return roll
+        return (int(roll.num_dice), roll.dice_type, int(roll.dice_modifier),
+                Roll.get_advantage_mode(roll.advantage))
+
+    def simulate(self, roll, trials):
+        """
+        Simulates a roll `trials` times.
+
+        :param roll: A `Roll` (such as a preset) or a dice expression string.
+        :type roll: Roll | str
+        :param trials: The total number of trials.
+        :type trials: int
+        :return: The merged histogram of simulated totals.
+        :rtype: SimulationResult
+        :raises ValueError: If `trials` is less than 1.
+        """
+        if trials < 1:
+            raise ValueError("A simulation needs at least 1 trial")
+        roll = SimulationService.describe_roll(roll)
+        workers = min(self.workers, trials)
+        worker_trials = [trials // workers + (index < trials % workers) for index in range(workers)]
+        seed_sequences = self.seed_sequence.spawn(workers)
+
+        if workers == 1:
+            return _simulate_trials(roll, trials, seed_sequences[0], SimulationService.CHUNK_SIZE)
+
+        results = self._get_executor().map(
+            _simulate_trials,
+            [roll] * workers,
+            worker_trials,
+            seed_sequences,
+            [SimulationService.CHUNK_SIZE] * workers,
+        )
+        merged = None
+        for result in results:
+            merged = result if merged is None else merged.merge(result)
+        return merged
+
+    def simulate_until(self, roll, statistic, target_width, confidence=0.95, total=None,
+                       percent=None, chunk_size=ADAPTIVE_CHUNK_SIZE, max_trials=MAX_TRIALS):
+        """
+        Simulates a roll in chunks until the confidence interval of a statistic is
+        no wider than `target_width`, or `max_trials` trials have been rolled.
+
+        Easy queries stop after a single chunk per worker, while hard ones keep
+        sampling. The number of trials actually used is the `trials` of the result.
+
+        :param roll: A `Roll` (such as a preset) or a dice expression string.
+        :type roll: Roll | str
+        :param statistic: "mean", "probability_at_least" (requires `total`) or
+            "percentile" (requires `percent`).
+        :type statistic: str
+        :param target_width: The widest acceptable confidence interval.
+        :type target_width: float
+        :param confidence: The confidence level, e.g. 0.95.
+        :type confidence: float
+        :param total: The total for "probability_at_least", e.g. a DC.
+        :type total: int | None
+        :param percent: The percentile for "percentile", between 0 and 100.
+        :type percent: float | None
+        :param chunk_size: The trials rolled by each worker between checks.
+        :type chunk_size: int
+        :param max_trials: The most trials to roll before giving up on the target.
+        :type max_trials: int
+        :return: The merged histogram of all simulated totals.
+        :rtype: SimulationResult
+        :raises ValueError: If the statistic is not supported, its `total` or `percent`
+            is missing, or `target_width`, `chunk_size` or `max_trials` is not positive.
+        """
+        if statistic not in SimulationResult.STATISTICS:
+            raise ValueError(f"Unsupported statistic: {statistic}")
+        if statistic == "probability_at_least" and total is None:
+            raise ValueError("The probability_at_least statistic needs a total")
+        if statistic == "percentile" and (percent is None or not 0 <= percent <= 100):
+            raise ValueError("The percentile statistic needs a percent between 0 and 100")
+        if target_width <= 0:
+            raise ValueError("The target width must be positive")
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be positive")
+        if max_trials < 1:
+            raise ValueError("The maximum number of trials must be positive")
+
+        result = None
+        while result is None or result.trials < max_trials:
+            trials = min(chunk_size * self.workers, max_trials - (0 if result is None else result.trials))
+            chunk = self.simulate(roll, trials)
+            result = chunk if result is None else result.merge(chunk)
+            lower, upper = result.confidence_interval(statistic, confidence, total, percent)
+            if upper - lower <= target_width:
+                break
+        return result
+
+    def simulate_presets(self, presets, trials):
+        """
+        Simulates every preset in a list.
+
+        :param presets: The presets to simulate.
+        :type presets: list[Roll]
+        :param trials: The number of trials per preset.
+        :type trials: int
+        :return: The result of each preset, keyed by preset name.
+        :rtype: dict[str, SimulationResult]
+        """
+        return {preset.name: self.simulate(preset, trials) for preset in presets}
+
+    def shutdown(self):
+        """
+        Stops the worker processes. A new pool is started by the next simulation.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+
+if __name__ == "__main__":
+    # Measures how simulation throughput scales with the number of worker processes.
+    import time
+
+    roll = Roll(8, "d6", 0)
+    trials = 20_000_000
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        with SimulationService(workers=workers, seed=1) as service:
+            service.simulate(roll, workers)  # start the worker processes
+            start = time.perf_counter()
+            result = service.simulate(roll, trials)
+            seconds = time.perf_counter() - start
+        print(f"{workers:>3} workers: {trials / seconds:,.0f} trials/s, "
+              f"mean {result.mean():.4f}, 95% CI {result.mean_confidence_interval()}")
+
+    # Trials needed to pin down P(total >= DC) for an easy and a hard query.
+    with SimulationService(seed=1) as service:
+        for dc in (2, 15):
+            result = service.simulate_until(Roll(1, "d20", 0), "probability_at_least", 0.005, total=dc)
+            print(f"P(d20 >= {dc}) = {result.probability_at_least(dc):.4f} after {result.trials:,} trials")
@@ -1,13 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+
+STARTED = time.perf_counter()
 
 from ui.ui_settings import UISettings
 from ui.main_window import MainWindow
 from application.dice_roll_app_controller import DiceRollAppController
 
+# Seconds from the first import to the first paint of the main window.
+STARTUP_BUDGET = 1.5
+
 if __name__ == '__main__':
+    # `python main.py --startup-benchmark [budget]` opens the window with AI messages
+    # off, reports the time to first paint and fails if it is over the budget. It
+    # uses a temporary roll journal so the user's journal is never modified.
+    benchmark = len(sys.argv) > 1 and sys.argv[1] == '--startup-benchmark'
+    benchmark_directory = tempfile.TemporaryDirectory() if benchmark else None
+
     dice_roll_app_controller = DiceRollAppController()
     dice_roll_app_controller.character_service.load_characters()
     dice_roll_app_controller.preset_service.load_presets()
+    if benchmark:
+        dice_roll_app_controller.load_roll_history(os.path.join(benchmark_directory.name, 'roll_journal.bin'))
+    else:
+        dice_roll_app_controller.load_roll_history()
 
     UISettings.apply_theme()
     window = MainWindow(dice_roll_app_controller)
-    window.run()
\ No newline at end of file
+    if benchmark:
+        window.window.refresh()
+        seconds = time.perf_counter() - STARTED
+        budget = float(sys.argv[2]) if len(sys.argv) > 2 else STARTUP_BUDGET
+        ai_loaded = 'google.genai' in sys.modules
+        print(f"First paint after {seconds:.3f} s (budget {budget:.3f} s), AI packages imported: {ai_loaded}")
+        window.window.close()
+        dice_roll_app_controller.close()
+        benchmark_directory.cleanup()
+        sys.exit(0 if seconds <= budget and not ai_loaded else 1)
+    window.run()
+    dice_roll_app_controller.close()
@@ -0,0 +1,27 @@
+import json
+import os
+
+
+class MessageCacheRepository:
+
+    @staticmethod
+    def save_cache_to_file(message_cache, filename='data/message_cache.json'):
+
+        data_to_write = [{'adjective': adjective, 'face': face,
+                          'variants': [{'created': created, 'message': message} for created, message in entries]}
+                         for (adjective, face), entries in message_cache.items()]
+        with open(f'{filename}', 'w', encoding='utf-8') as f:
+            json.dump(data_to_write, f, indent=4)
+
+    @staticmethod
+    def load_cache_from_file(message_cache, filename='data/message_cache.json'):
+
+        if not os.path.exists(filename):
+            return message_cache
+        with open(f'{filename}', 'r', encoding='utf-8') as f:
+            cache_json = f.read()
+        for entry in json.loads(cache_json):
+            key = (entry['adjective'], entry['face'])
+            for variant in entry['variants']:
+                message_cache.add(key, variant['message'], variant['created'])
+        return message_cache
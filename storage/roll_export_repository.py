@@ -0,0 +1,53 @@
+import csv
+import os
+
+
+class RollExportRepository:
+    """
+    Exports roll results to files one result at a time, so results can be
+    streamed from a lazy iterator without being collected into a list.
+    """
+
+    fields = ["num_dice", "dice_type", "dice_modifier", "advantage", "dice_rolls", "dice_total", "total"]
+
+    @staticmethod
+    def save_rolls_to_csv(roll_results, filename='data/roll_export.csv'):
+        """
+        Writes roll results to a CSV file, one row per result, with the individual
+        dice rolls separated by spaces.
+
+        :return: The number of results written.
+        """
+        count = 0
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(RollExportRepository.fields)
+            for roll_result in roll_results:
+                writer.writerow(RollExportRepository.to_row(roll_result))
+                count += 1
+        return count
+
+    @staticmethod
+    def append_roll_to_csv(roll_result, filename='data/roll_history_spill.csv'):
+        """
+        Appends one roll result to a CSV file, writing the header first if the file
+        is new. Used to spill rolls evicted from a bounded `RollHistory`.
+        """
+        is_new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        with open(filename, "a", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if is_new_file:
+                writer.writerow(RollExportRepository.fields)
+            writer.writerow(RollExportRepository.to_row(roll_result))
+
+    @staticmethod
+    def to_row(roll_result):
+        return [
+            roll_result.num_dice,
+            roll_result.dice_type,
+            roll_result.dice_modifier,
+            roll_result.advantage,
+            " ".join(str(roll) for roll in roll_result.dice_rolls),
+            roll_result.dice_total,
+            roll_result.total,
+        ]
@@ -0,0 +1,391 @@
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+
+from domain.models.roll import Roll, RollResult
+
+
+class RollJournal:
+    """
+    Records roll results in an append-only binary journal, so the roll history
+    survives between sessions.
+
+    The file starts with a short header, followed by one record per roll: a
+    fixed-size part holding the time, dice, modifier, totals and advantage, then
+    the individual dice as unsigned 16-bit integers. Recording a roll only packs
+    the record and queues it; a background thread writes queued records in batches
+    and flushes them every `flush_interval` seconds. Reading maps the file into
+    memory and unpacks records in place.
+
+    Clearing the history is recorded as a record with no dice and 0 sides, so a
+    later session can restore only the rolls made after the last clear.
+
+    Records vary in length, so a sidecar index file (the journal's name followed by
+    `.idx`) holds the offset and time of every `INDEX_INTERVAL`-th record. Opening
+    the journal and replaying its last rolls start from the last index entries
+    instead of walking the whole file, so they cost the same however large the
+    journal grows. A missing, damaged or stale index is rebuilt when the journal
+    is opened.
+
+    :ivar filename: The path of the journal file.
+    :type filename: str
+    :ivar flush_interval: The most time, in seconds, a recorded roll waits before
+        it is written to disk.
+    :type flush_interval: float
+    """
+    MAGIC = b'RJNL'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHxx')
+    # Time, number of dice, modifier, dice total, sides, advantage mode, number of faces.
+    RECORD = struct.Struct('<dIiqHBxI')
+    FACE_SIZE = 2
+    FLUSH_INTERVAL = 0.5
+    # The sides of a clear record, which marks where the history was cleared.
+    CLEAR_SIDES = 0
+    # Offset and time of an indexed record.
+    INDEX_ENTRY = struct.Struct('<Qd')
+    INDEX_INTERVAL = 1024
+
+    def __init__(self, filename='data/roll_journal.bin', flush_interval=FLUSH_INTERVAL):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        length, self._unindexed, index_entries, rebuild_index = RollJournal._walk_tail(filename)
+        if os.path.exists(filename) and length < os.path.getsize(filename):
+            # Drop a record cut short by a crash so new records stay aligned.
+            os.truncate(filename, length)
+        self._file = open(filename, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(RollJournal.HEADER.pack(RollJournal.MAGIC, RollJournal.VERSION))
+            self._file.flush()
+        self._end = self._file.tell()
+        self._index = open(RollJournal.index_filename(filename), 'wb' if rebuild_index else 'ab')
+        self._index.write(b''.join(index_entries))
+        self._index.flush()
+        self._writer = threading.Thread(target=self._write_records, name='roll-journal-writer', daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, roll_result):
+        """
+        Queues a roll result to be appended to the journal.
+
+        :param roll_result: The roll result to record.
+        :type roll_result: RollResult
+        :raises ValueError: If the journal is closed.
+        """
+        if self._closed:
+            raise ValueError("The roll journal is closed")
+        self._queue.put(RollJournal.pack(roll_result))
+
+    def record_clear(self, timestamp=None):
+        """
+        Queues a clear record, marking that the history was cleared.
+
+        :param timestamp: The time of the clear, defaulting to now.
+        :type timestamp: float | None
+        :raises ValueError: If the journal is closed.
+        """
+        if self._closed:
+            raise ValueError("The roll journal is closed")
+        self._queue.put(RollJournal.RECORD.pack(time.time() if timestamp is None else timestamp,
+                                                0, 0, 0, RollJournal.CLEAR_SIDES, 0, 0))
+
+    def flush(self):
+        """
+        Blocks until every roll recorded so far has been written and flushed.
+        """
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self):
+        """
+        Writes the remaining rolls, stops the writer thread and closes the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+        self._index.close()
+
+    @staticmethod
+    def index_filename(filename):
+        return f'{filename}.idx'
+
+    @staticmethod
+    def pack(roll_result, timestamp=None):
+        """
+        Packs a roll result into a journal record.
+
+        :param roll_result: The roll result to pack.
+        :type roll_result: RollResult
+        :param timestamp: The time of the roll, defaulting to now.
+        :type timestamp: float | None
+        :rtype: bytes
+        """
+        faces = array('H', roll_result.dice_rolls)
+        if sys.byteorder == 'big':
+            faces.byteswap()
+        header = RollJournal.RECORD.pack(time.time() if timestamp is None else timestamp,
+                                         int(roll_result.num_dice),
+                                         int(roll_result.dice_modifier),
+                                         int(roll_result.dice_total),
+                                         int(roll_result.dice_type[1:]),
+                                         Roll.get_advantage_mode(roll_result.advantage),
+                                         len(faces))
+        return header + faces.tobytes()
+
+    @staticmethod
+    def scan(filename='data/roll_journal.bin'):
+        """
+        Iterates over the fixed-size part of every complete record without reading
+        the file: the file is memory-mapped and each record is unpacked in place.
+        A record cut short by a crash ends the scan. Clear records have 0 sides.
+
+        :param filename: The path of the journal file.
+        :type filename: str
+        :return: An iterator of (time, num_dice, modifier, dice_total, sides,
+            advantage mode, face count) tuples.
+        :rtype: Iterator[tuple]
+        :raises ValueError: If the file is not a roll journal.
+        """
+        with RollJournal._map(filename) as journal:
+            for record, _ in RollJournal._records(journal):
+                yield record
+
+    @staticmethod
+    def replay(filename='data/roll_journal.bin', since=None, last=None, after_clear=False):
+        """
+        Rebuilds the roll results recorded in a journal, oldest first. Clear records
+        are skipped.
+
+        :param filename: The path of the journal file.
+        :type filename: str
+        :param since: Only replay rolls recorded at or after this time, e.g. the
+            start of a past session.
+        :type since: float | None
+        :param last: Only replay the last `last` rolls. They are found from the
+            index, so the rest of the journal is not read.
+        :type last: int | None
+        :param after_clear: Only replay rolls recorded after the last clear record.
+        :type after_clear: bool
+        :rtype: Iterator[RollResult]
+        :raises ValueError: If the file is not a roll journal.
+        """
+        advantages = {value: mode for mode, value in Roll.advantage_modes.items()}
+        with RollJournal._map(filename) as journal:
+            records = RollJournal._records(journal)
+            if last is not None:
+                index = RollJournal._read_index(filename, journal)
+                # Every index entry but the last is followed by INDEX_INTERVAL records.
+                entry = len(index) - 1 - -(-last // RollJournal.INDEX_INTERVAL)
+                start = index[entry] if index and entry >= 0 else RollJournal.HEADER.size
+                records = deque(RollJournal._records(journal, start), maxlen=last)
+            if after_clear:
+                records = list(records)
+                clears = [position for position, (record, _) in enumerate(records)
+                          if record[4] == RollJournal.CLEAR_SIDES]
+                if clears:
+                    records = records[clears[-1] + 1:]
+            for record, faces_offset in records:
+                timestamp, num_dice, modifier, dice_total, sides, advantage, face_count = record
+                if sides == RollJournal.CLEAR_SIDES or (since is not None and timestamp < since):
+                    continue
+                faces = array('H')
+                faces.frombytes(journal[faces_offset:faces_offset + face_count * RollJournal.FACE_SIZE])
+                if sys.byteorder == 'big':
+                    faces.byteswap()
+                yield RollResult(num_dice, f'd{sides}', faces, modifier, dice_total,
+                                 advantage=advantages.get(advantage, 'normal_roll'))
+
+    @staticmethod
+    def iter_faces(filename='data/roll_journal.bin'):
+        """
+        Iterates over the individual dice of every complete record without building
+        roll results, for fast single-pass analysis of large journals.
+
+        :param filename: The path of the journal file.
+        :type filename: str
+        :return: An iterator of (sides, faces) pairs, where faces holds the record's
+            dice as little-endian unsigned 16-bit integers. Clear records give (0, b'').
+        :rtype: Iterator[tuple[int, bytes]]
+        :raises ValueError: If the file is not a roll journal.
+        """
+        with RollJournal._map(filename) as journal:
+            for record, faces_offset in RollJournal._records(journal):
+                yield record[4], journal[faces_offset:faces_offset + record[-1] * RollJournal.FACE_SIZE]
+
+    @staticmethod
+    @contextmanager
+    def _map(filename):
+        if not os.path.exists(filename) or os.path.getsize(filename) < RollJournal.HEADER.size:
+            yield b''
+            return
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as journal:
+            magic, version = RollJournal.HEADER.unpack_from(journal, 0)
+            if magic != RollJournal.MAGIC or version != RollJournal.VERSION:
+                raise ValueError(f"{filename} is not a roll journal")
+            yield journal
+
+    @staticmethod
+    def _records(journal, offset=HEADER.size):
+        size = len(journal)
+        while offset + RollJournal.RECORD.size <= size:
+            record = RollJournal.RECORD.unpack_from(journal, offset)
+            faces_offset = offset + RollJournal.RECORD.size
+            offset = faces_offset + record[-1] * RollJournal.FACE_SIZE
+            if offset > size:
+                return
+            yield record, faces_offset
+
+    @staticmethod
+    def _read_index(filename, journal):
+        """
+        Returns the record offsets held by the journal's index, or an empty list if
+        the index is missing or does not match the journal.
+        """
+        try:
+            with open(RollJournal.index_filename(filename), 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return []
+        if len(data) % RollJournal.INDEX_ENTRY.size:
+            return []
+        offsets = []
+        for offset, timestamp in RollJournal.INDEX_ENTRY.iter_unpack(data):
+            if offset <= (offsets[-1] if offsets else RollJournal.HEADER.size - 1) \
+                    or offset + RollJournal.RECORD.size > len(journal):
+                return []
+            offsets.append(offset)
+        if offsets and (offsets[0] != RollJournal.HEADER.size
+                        or RollJournal.RECORD.unpack_from(journal, offset)[0] != timestamp):
+            return []
+        return offsets
+
+    @staticmethod
+    def _walk_tail(filename):
+        """
+        Walks the records after the last index entry of a journal.
+
+        :return: The length of the journal up to its last complete record, the
+            number of records after the last index entry, the index entries
+            missing for those records, and whether the index must be rewritten
+            from scratch with them.
+        :rtype: tuple[int, int, list[bytes], bool]
+        :raises ValueError: If the file is not a roll journal.
+        """
+        with RollJournal._map(filename) as journal:
+            if not journal:
+                return 0, 0, [], True
+            index = RollJournal._read_index(filename, journal)
+            while True:
+                start = index[-1] if index else RollJournal.HEADER.size
+                length, count, entries = start, 0, []
+                for record, faces_offset in RollJournal._records(journal, start):
+                    if count % RollJournal.INDEX_INTERVAL == 0 and (count or not index):
+                        entries.append(RollJournal.INDEX_ENTRY.pack(faces_offset - RollJournal.RECORD.size,
+                                                                    record[0]))
+                    count += 1
+                    length = faces_offset + record[-1] * RollJournal.FACE_SIZE
+                if index and not count:
+                    # The last entry points at a record cut short by a crash.
+                    index = []
+                    continue
+                return length, count % RollJournal.INDEX_INTERVAL, entries, not index
+
+    def _write_records(self):
+        while True:
+            item = self._queue.get()
+            batch, waiters, stop = [], [], False
+            # Gather rolls for up to `flush_interval` so they are written together.
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                timeout = deadline - time.monotonic()
+                if stop or waiters or timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._file.write(b''.join(batch))
+                entries = []
+                for record in batch:
+                    if self._unindexed == 0:
+                        timestamp = RollJournal.RECORD.unpack_from(record)[0]
+                        entries.append(RollJournal.INDEX_ENTRY.pack(self._end, timestamp))
+                    self._unindexed = (self._unindexed + 1) % RollJournal.INDEX_INTERVAL
+                    self._end += len(record)
+                self._file.flush()
+                self._index.write(b''.join(entries))
+                self._index.flush()
+            else:
+                self._file.flush()
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+
+if __name__ == '__main__':
+    # Measures the cost of recording a roll and of replaying the journal.
+    import tempfile
+
+    from domain.services.dice_roll_service import DiceRollService
+
+    service = DiceRollService()
+    results = [service.roll_dice(num_dice, dice_type, 1, 0)
+               for num_dice, dice_type in [(1, 'd20'), (2, 'd6'), (8, 'd6'), (1, 'd8')] * 25_000]
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'roll_journal.bin')
+        with RollJournal(filename) as journal:
+            start = time.perf_counter()
+            for result in results:
+                journal.record(result)
+            seconds = time.perf_counter() - start
+        print(f"record: {seconds / len(results) * 1e6:.2f} us per roll, "
+              f"{os.path.getsize(filename) / len(results):.1f} bytes per roll on disk")
+
+        start = time.perf_counter()
+        scanned = sum(1 for _ in RollJournal.scan(filename))
+        scan_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        replayed = list(RollJournal.replay(filename))
+        replay_seconds = time.perf_counter() - start
+        assert scanned == len(replayed) == len(results)
+        assert all(list(a.dice_rolls) == list(b.dice_rolls) and a.total == b.total
+                   for a, b in zip(results, replayed))
+        print(f"scan: {scan_seconds / scanned * 1e6:.2f} us per roll, "
+              f"replay: {replay_seconds / scanned * 1e6:.2f} us per roll")
+
+        start = time.perf_counter()
+        tail = list(RollJournal.replay(filename, last=500))
+        print(f"replay of the last {len(tail)} rolls: {(time.perf_counter() - start) * 1e3:.2f} ms")
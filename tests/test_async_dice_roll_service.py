@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from domain.models.roll import Roll
+from domain.services.async_dice_roll_service import AsyncDiceRollService
+from domain.services.simulation_service import SimulationService
+
+
+def run_counting_executor_calls(make_call):
+    service = AsyncDiceRollService()
+    calls = []
+    run = service._run
+
+    async def counting_run(function, *args):
+        calls.append(function)
+        return await run(function, *args)
+
+    service._run = counting_run
+    result = asyncio.run(make_call(service))
+    return result, len(calls)
+
+
+@pytest.mark.parametrize('num_dice, in_executor', [(3, False), (100, False), (999, True), (10 ** 5, True)])
+def test_roll_uses_executor_for_many_dice(num_dice, in_executor):
+    result, executor_calls = run_counting_executor_calls(lambda service: service.roll(num_dice, 'd6', 0))
+    assert result.num_dice == num_dice
+    assert (executor_calls > 0) == in_executor
+
+
+@pytest.mark.parametrize('expression, in_executor', [('2d6 + 3', False), ('5000d6kh1', True),
+                                                     ('60d6 + 60d8', True)])
+def test_roll_expression_uses_executor_for_many_dice(expression, in_executor):
+    _, executor_calls = run_counting_executor_calls(lambda service: service.roll_expression(expression))
+    assert (executor_calls > 0) == in_executor
+
+
+def test_aclose_stops_the_simulation_workers():
+    async def simulate_and_close():
+        async with AsyncDiceRollService() as service:
+            result = await service.simulate(Roll(1, 'd20', 0), 1_000)
+            simulation_service = service.simulation_service
+        return result, service, simulation_service
+
+    result, service, simulation_service = asyncio.run(simulate_and_close())
+    assert result.trials == 1_000
+    assert service.simulation_service is None
+    assert simulation_service._executor is None
+
+
+def test_aclose_leaves_a_shared_simulation_service_running():
+    with SimulationService(workers=2, seed=1) as simulation_service:
+        service = AsyncDiceRollService(simulation_service=simulation_service)
+        asyncio.run(service.simulate(Roll(1, 'd20', 0), 1_000))
+        asyncio.run(service.aclose())
+        assert service.simulation_service is simulation_service
+        assert simulation_service._executor is not None
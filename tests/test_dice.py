@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from domain.models.dice import DiceRoller
+
+
+@pytest.mark.parametrize('keep', [2, 3, 10])
+def test_keep_batch_keeps_whole_pool_when_keep_reaches_pool_size(keep):
+    dice_totals, dice_rolls = DiceRoller().keep_batch('d6', 2, keep, trials=50)
+    assert np.array_equal(dice_totals, dice_rolls.sum(axis=1))
+
+
+@pytest.mark.parametrize('keep', [2, 3, 10])
+def test_keep_roll_keeps_whole_pool_when_keep_reaches_pool_size(keep):
+    dice_rolls, dice_total = DiceRoller().keep_roll('d6', 2, keep)
+    assert dice_total == sum(dice_rolls)
+
+
+def test_negative_keep_is_rejected():
+    roller = DiceRoller()
+    with pytest.raises(ValueError):
+        roller.keep_roll('d6', 2, -1)
+    with pytest.raises(ValueError):
+        roller.keep_batch('d6', 2, -1, trials=5)
@@ -0,0 +1,56 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from domain.models.dice import Die
+from domain.models.rng import create_random_source
+from domain.services.dice_roll_service import DiceRollService
+
+
+def check_rolls(service, seed, iterations):
+    generator = random.Random(seed)
+    for _ in range(iterations):
+        num_dice = generator.choice([1, 2, 5, 20, 1500])
+        dice_type = generator.choice(Die.get_dice_types())
+        dice_modifier = generator.randint(-5, 5)
+        advantage = generator.randint(0, 2)
+        result = service.roll_dice(num_dice, dice_type, dice_modifier, advantage)
+
+        dice_rolls = list(result.dice_rolls)
+        if DiceRollService.is_d20_roll(num_dice, dice_type):
+            assert len(dice_rolls) == 2
+            assert result.dice_total == {1: max(dice_rolls), 2: min(dice_rolls)}.get(advantage, dice_rolls[0])
+        else:
+            assert len(dice_rolls) == num_dice
+            assert sum(dice_rolls) == result.dice_total
+        assert all(1 <= roll <= Die.dice_types[dice_type] for roll in dice_rolls)
+        assert result.total == result.dice_total + dice_modifier
+    return iterations
+
+
+@pytest.mark.parametrize('rng', [None, create_random_source('pcg64', seed=1)], ids=['default', 'pcg64'])
+@pytest.mark.parametrize('threads, iterations', [(4, 200), (32, 100)])
+def test_concurrent_rolls_are_consistent(rng, threads, iterations):
+    service = DiceRollService(rng)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        checked = sum(executor.map(lambda seed: check_rolls(service, seed, iterations), range(threads * 2)))
+    assert checked == threads * 2 * iterations
+
+
+def test_random_seed_applies_to_every_roll():
+    service = DiceRollService()
+
+    def roll_seeded():
+        random.seed(1234)
+        return [list(service.roll_dice(4, 'd6', 0, 0).dice_rolls) for _ in range(5)]
+
+    first = roll_seeded()
+    assert roll_seeded() == first
+
+    in_other_thread = []
+    thread = threading.Thread(target=lambda: in_other_thread.append(roll_seeded()))
+    thread.start()
+    thread.join()
+    assert in_other_thread == [first]
@@ -0,0 +1,59 @@
+from fractions import Fraction
+
+import pytest
+
+from domain.models.dice import Die
+from domain.models.distribution import RollDistribution
+
+
+def enumerate_die(sides, explode, reroll_below, min_face, max_explosions):
+    """
+    Returns the exact distribution of one `Die.roll` by walking every sequence of faces.
+    """
+    outcomes = {}
+
+    def explode_from(face, total, probability, explosions):
+        if explode and face == sides and explosions < max_explosions:
+            for extra in range(1, sides + 1):
+                explode_from(extra, total + extra, probability / sides, explosions + 1)
+        else:
+            outcomes[total] = outcomes.get(total, 0) + probability
+
+    for first in range(1, sides + 1):
+        rolls = [(first, Fraction(1, sides))]
+        if reroll_below is not None and first < reroll_below:
+            rolls = [(face, Fraction(1, sides * sides)) for face in range(1, sides + 1)]
+        for face, probability in rolls:
+            total = face if min_face is None else max(face, min_face)
+            explode_from(face, total, probability, 0)
+    return outcomes
+
+
+@pytest.mark.parametrize('dice_type', ['d4', 'd6'])
+@pytest.mark.parametrize('explode', [False, True])
+@pytest.mark.parametrize('reroll_below', [None, 2])
+@pytest.mark.parametrize('min_face', [None, 2, 'sides'])
+def test_for_die_matches_enumeration(dice_type, explode, reroll_below, min_face):
+    sides = Die.dice_types[dice_type]
+    min_face = sides if min_face == 'sides' else min_face
+    expected = enumerate_die(sides, explode, reroll_below, min_face, max_explosions=3)
+
+    distribution = RollDistribution.for_die(dice_type, explode=explode, reroll_below=reroll_below,
+                                            min_face=min_face, max_explosions=3)
+
+    assert distribution.probabilities.sum() == pytest.approx(1.0)
+    for total in range(distribution.minimum, distribution.maximum + 1):
+        assert distribution.pmf(total) == pytest.approx(float(expected.get(total, 0)), abs=1e-12)
+    assert sum(expected.values()) == 1
+
+
+@pytest.mark.parametrize('min_face', [None, 6])
+def test_for_die_does_not_explode_without_explosions(min_face):
+    distribution = RollDistribution.for_die('d6', explode=True, min_face=min_face, max_explosions=0)
+
+    die = Die('d6', explode=True, min_face=min_face, max_explosions=0)
+    totals = {die.roll() for _ in range(2_000)}
+    assert distribution.maximum == 6
+    assert totals <= set(range(distribution.minimum, distribution.maximum + 1))
+    assert {total for total in distribution.totals.tolist() if distribution.pmf(total) > 0} == totals
+    assert distribution.probabilities.sum() == pytest.approx(1.0)
@@ -0,0 +1,27 @@
+import pytest
+
+from domain.models.rng import BufferedRandomSource, RandomSource, create_random_source
+
+
+class RandintOnlySource(RandomSource):
+    def randint(self, low, high):
+        return low
+
+
+def test_random_source_requires_every_primitive():
+    with pytest.raises(TypeError):
+        RandomSource()
+    with pytest.raises(TypeError):
+        RandintOnlySource()
+
+
+@pytest.mark.parametrize('kind', ['python', 'pcg64', 'philox', 'system'])
+@pytest.mark.parametrize('buffered', [False, True])
+def test_sources_implement_the_interface(kind, buffered):
+    rng = create_random_source(kind, seed=1, buffered=buffered)
+    assert isinstance(rng, BufferedRandomSource) == buffered
+    assert 1 <= rng.randint(1, 6) <= 6
+    assert all(1 <= face <= 6 for face in rng.integers(1, 6, 100))
+    assert rng.multinomial(20, 6).sum() == 20
+    assert len(rng.random_bytes(8)) == 8
+    assert all(isinstance(child, RandomSource) for child in rng.spawn(2))
@@ -0,0 +1,65 @@
+import random
+
+from domain.models.roll import RollResult
+from domain.models.roll_history import RollHistory
+from domain.models.roll_statistics import RollStatistics
+
+
+def make_roll(dice_type='d6', faces=(3, 4), modifier=0, name=''):
+    roll = RollResult(len(faces), dice_type, list(faces), modifier, sum(faces))
+    roll.name = name
+    return roll
+
+
+def assert_statistics_match(history):
+    expected = RollStatistics()
+    for roll in history.rolls:
+        expected.add(roll)
+    statistics = history.statistics
+    assert statistics.overall.histogram == expected.overall.histogram
+    assert {key: value.histogram for key, value in statistics.by_dice_type.items()} == \
+        {key: value.histogram for key, value in expected.by_dice_type.items()}
+    assert {key: value.histogram for key, value in statistics.by_preset.items()} == \
+        {key: value.histogram for key, value in expected.by_preset.items()}
+    assert statistics.face_counts == expected.face_counts
+    assert (statistics.natural_ones, statistics.natural_twenties) == \
+        (expected.natural_ones, expected.natural_twenties)
+
+
+def test_update_roll_after_changing_roll_in_place():
+    history = RollHistory(statistics=RollStatistics())
+    roll = make_roll(modifier=2, name='Attack')
+    history.add_roll(roll)
+    history.add_roll(make_roll('d20', (20,)))
+
+    roll.dice_modifier = 10
+    roll.name = 'Damage'
+    roll.dice_rolls = [6, 6]
+    roll.dice_total = 12
+    history.update_roll(roll, 0)
+
+    assert_statistics_match(history)
+    assert 'Attack' not in history.statistics.by_preset
+    assert history.statistics.get_statistics(preset='Damage').mean == 22
+
+
+def test_statistics_follow_random_operations():
+    generator = random.Random(7)
+    history = RollHistory(capacity=20, statistics=RollStatistics())
+    for _ in range(500):
+        operation = generator.random()
+        if operation < 0.6 or not len(history):
+            dice_type = generator.choice(['d6', 'd20'])
+            faces = [generator.randint(1, int(dice_type[1:])) for _ in range(generator.randint(1, 3))]
+            history.add_roll(make_roll(dice_type, faces, generator.randint(-2, 2), generator.choice(['', 'A', 'B'])))
+        elif operation < 0.8:
+            index = generator.randrange(len(history))
+            roll = history.get_roll(index)
+            roll.dice_modifier += 1
+            roll.name = generator.choice(['', 'A', 'B'])
+            history.update_roll(roll, index)
+        elif operation < 0.98:
+            history.remove_roll(generator.randrange(len(history)))
+        else:
+            history.clear()
+        assert_statistics_match(history)
@@ -0,0 +1,137 @@
+import os
+import random
+
+import pytest
+
+from application.dice_roll_app_controller import DiceRollAppController
+from domain.models.columnar_roll_history import ColumnarRollHistory
+from domain.models.roll import RollResult
+from storage.roll_journal import RollJournal
+
+
+def make_roll(modifier, generator):
+    faces = [generator.randint(1, 6) for _ in range(generator.randint(1, 4))]
+    return RollResult(len(faces), 'd6', faces, modifier, sum(faces))
+
+
+def describe(rolls):
+    return [(roll.dice_modifier, list(roll.dice_rolls)) for roll in rolls]
+
+
+@pytest.fixture
+def small_index(monkeypatch):
+    monkeypatch.setattr(RollJournal, 'INDEX_INTERVAL', 8)
+
+
+def test_replay_last_matches_full_replay_across_sessions(tmp_path, small_index):
+    filename = str(tmp_path / 'roll_journal.bin')
+    generator = random.Random(3)
+    recorded = 0
+    for _ in range(6):
+        with RollJournal(filename) as journal:
+            for _ in range(generator.randint(0, 40)):
+                journal.record(make_roll(recorded, generator))
+                recorded += 1
+        rolls = describe(RollJournal.replay(filename))
+        assert len(rolls) == recorded
+        for last in (0, 1, 7, 8, 9, 30, 1000):
+            assert describe(RollJournal.replay(filename, last=last)) == (rolls[-last:] if last else [])
+
+
+def test_index_is_rebuilt_when_missing_or_damaged(tmp_path, small_index):
+    filename = str(tmp_path / 'roll_journal.bin')
+    generator = random.Random(5)
+    with RollJournal(filename) as journal:
+        for modifier in range(50):
+            journal.record(make_roll(modifier, generator))
+    with open(RollJournal.index_filename(filename), 'rb') as file:
+        index = file.read()
+    rolls = describe(RollJournal.replay(filename))
+
+    os.remove(RollJournal.index_filename(filename))
+    RollJournal(filename).close()
+    with open(RollJournal.index_filename(filename), 'rb') as file:
+        assert file.read() == index
+
+    with open(RollJournal.index_filename(filename), 'ab') as file:
+        file.write(b'partial')
+    with open(filename, 'ab') as file:
+        file.write(b'\x01\x02\x03')
+    RollJournal(filename).close()
+    assert describe(RollJournal.replay(filename, last=20)) == rolls[-20:]
+
+
+def test_controller_moves_aside_a_file_that_is_not_a_journal(tmp_path):
+    filename = str(tmp_path / 'roll_journal.bin')
+    with open(filename, 'wb') as file:
+        file.write(b'not a roll journal')
+
+    controller = DiceRollAppController()
+    controller.load_roll_history(filename)
+    controller.roll_history.add_roll(RollResult(1, 'd20', [12], 0, 12))
+    controller.close()
+
+    assert os.path.exists(f'{filename}.bad')
+    assert describe(RollJournal.replay(filename)) == [(0, [12])]
+
+
+def test_controller_journals_new_rolls(tmp_path):
+    filename = str(tmp_path / 'roll_journal.bin')
+    controller = DiceRollAppController()
+    controller.load_roll_history(filename)
+    controller.roll_history.add_roll(RollResult(2, 'd6', [3, 5], 1, 8))
+    controller.close()
+
+    assert describe(RollJournal.replay(filename)) == [(1, [3, 5])]
+
+
+def test_controller_rejects_columnar_history():
+    with pytest.raises(ValueError, match='columnar'):
+        DiceRollAppController(columnar_history=True)
+
+
+def test_columnar_history_journals_new_rolls(tmp_path):
+    filename = str(tmp_path / 'roll_journal.bin')
+    journal = RollJournal(filename)
+    history = ColumnarRollHistory(journal)
+    history.add_roll(RollResult(2, 'd6', [3, 5], 1, 8))
+    history.clear()
+    history.add_roll(RollResult(1, 'd20', [12], 0, 12))
+    journal.close()
+
+    assert describe(RollJournal.replay(filename, after_clear=True)) == [(0, [12])]
+
+
+def test_clearing_the_history_is_not_undone_by_the_next_session(tmp_path, small_index):
+    filename = str(tmp_path / 'roll_journal.bin')
+    controller = DiceRollAppController()
+    controller.load_roll_history(filename)
+    for modifier in range(20):
+        controller.roll_history.add_roll(RollResult(1, 'd6', [4], modifier, 4))
+    controller.roll_history.clear()
+    for modifier in range(20, 23):
+        controller.roll_history.add_roll(RollResult(1, 'd6', [4], modifier, 4))
+    controller.close()
+
+    controller = DiceRollAppController()
+    controller.load_roll_history(filename)
+    controller.close()
+    assert [roll.dice_modifier for roll in controller.roll_history.rolls] == [20, 21, 22]
+    assert len(list(RollJournal.replay(filename))) == 23
+
+
+def test_replay_after_clear_with_clear_outside_the_tail(tmp_path, small_index):
+    filename = str(tmp_path / 'roll_journal.bin')
+    with RollJournal(filename) as journal:
+        journal.record(RollResult(1, 'd6', [1], 0, 1))
+        journal.record_clear()
+        for modifier in range(1, 30):
+            journal.record(RollResult(1, 'd6', [1], modifier, 1))
+        journal.record_clear()
+    assert list(RollJournal.replay(filename, last=10, after_clear=True)) == []
+    assert len(list(RollJournal.replay(filename, after_clear=True))) == 0
+
+    with RollJournal(filename) as journal:
+        journal.record(RollResult(1, 'd6', [1], 99, 1))
+    assert [roll.dice_modifier for roll in RollJournal.replay(filename, last=10, after_clear=True)] == [99]
+    assert len(list(RollJournal.replay(filename, last=10))) == 9
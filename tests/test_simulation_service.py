@@ -0,0 +1,44 @@
+import pytest
+
+from domain.models.roll import Roll
+from domain.services.simulation_service import SimulationService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = SimulationService(workers=1, seed=1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Invalid arguments must be rejected before simulating")
+
+    monkeypatch.setattr(service, 'simulate', fail)
+    return service
+
+
+@pytest.mark.parametrize('arguments', [
+    dict(statistic='median', target_width=0.1),
+    dict(statistic='probability_at_least', target_width=0.01),
+    dict(statistic='percentile', target_width=1),
+    dict(statistic='percentile', target_width=1, percent=101),
+    dict(statistic='mean', target_width=0),
+    dict(statistic='mean', target_width=0.1, chunk_size=0),
+    dict(statistic='mean', target_width=0.1, max_trials=0),
+])
+def test_simulate_until_rejects_invalid_arguments_up_front(service, arguments):
+    with pytest.raises(ValueError):
+        service.simulate_until(Roll(1, 'd20', 0), **arguments)
+
+
+def test_simulate_until_stops_at_target_width():
+    with SimulationService(workers=1, seed=1) as service:
+        result = service.simulate_until(Roll(1, 'd20', 0), 'probability_at_least', 0.05, total=11,
+                                        chunk_size=1_000)
+    lower, upper = result.probability_confidence_interval(11)
+    assert upper - lower <= 0.05
+
+
+@pytest.mark.parametrize('trials', [0, -5])
+def test_simulate_rejects_fewer_than_one_trial(trials):
+    with SimulationService(workers=2, seed=1) as service:
+        with pytest.raises(ValueError):
+            service.simulate(Roll(1, 'd20', 0), trials)
@@ -1,12 +1,13 @@
 import FreeSimpleGUI as sg
 
-from domain.models.messages import Messages
 from domain.models.character import Character
 from domain.models.roll import RollResult, Roll
-from domain.models.roll_history import RollHistory
 
 from ui.main_window_layout import build_layout
 from ui.character_window import CharacterWindow
+from ui.roll_history_view import RollHistoryView
+from ui.virtual_list import VirtualList
+from ui.roll_message_worker import RollMessageWorker
 
 
 class MainWindow:
@@ -23,10 +24,18 @@ class MainWindow:
     :type controller: DiceRollAppController
     :ivar character: The currently active character loaded in the application, fetched using the character service.
     :type character: Character
-    :ivar roll_history: An instance for tracking dice roll history.
-    :type roll_history: RollHistory
-    :ivar roll_result_messages: A structure containing messages related to roll results.
-    :type roll_result_messages: Messages
+    :ivar roll_history_view: Keeps the roll history listbox in step with the controller's roll history.
+    :type roll_history_view: RollHistoryView
+    :ivar preset_list: Shows the listed presets, loading only the visible rows into the listbox.
+    :type preset_list: VirtualList
+    :ivar loaded_preset: The preset last loaded into the roll settings, whose name is given to
+        rolls made with its settings, or None.
+    :type loaded_preset: Roll | None
+    :ivar roll_result_messages: A structure containing messages related to roll results, created
+        when AI messages are first used.
+    :type roll_result_messages: Messages | None
+    :ivar message_worker: Generates roll messages in the background and posts them back as window events.
+    :type message_worker: RollMessageWorker
     :ivar layout: The layout of the PySimpleGUI window, constructed based on preset and character data.
     :type layout: Any
     :ivar window: The PySimpleGUI window instance used in the application.
@@ -36,18 +45,22 @@ class MainWindow:
         self.controller = dice_roll_app_controller
         sg.theme('DarkGrey15')
         self.character=self.controller.character_service.get_character_by_id("default")
-        self.roll_history = RollHistory()
         (self.controller.
             preset_service.add_character_default_presets(self.character))
-        self.roll_result_messages = Messages()
+        self.roll_result_messages = None
+        self.loaded_preset = None
         self.layout = build_layout(
-            preset_values=self.controller.
-                preset_service.
-                get_presets_by_character(self.character.character_id),
-            history_values=self.roll_history.get_rolls_by_type(),
+            preset_values=[],
+            history_values=[],
             character_list=self.controller.character_service.get_characters()
         )
         self.window = sg.Window('Dice Roller Application', self.layout, finalize=True)
+        self.roll_history_view = RollHistoryView(self.window['roll_history'], self.controller.roll_history)
+        self.roll_history_view.refresh()
+        self.message_worker = RollMessageWorker(None, self.window)
+        self.preset_list = VirtualList(self.window['roll_preset'],
+                                       self.controller.preset_service.get_presets_by_character(
+                                           self.character.character_id))
 
         text_intro = f"Currently Loaded Character: {self.character.name}"
         self.window['character_name'].update(value=text_intro)
@@ -77,11 +90,17 @@ class MainWindow:
                 case 'clear_history':
                     self.clear_roll_history()
                 case 'roll_history':
-                    roll = values['roll_history'][0]
-                    self.load_preset(roll)
+                    roll = self.roll_history_view.get_selected_roll()
+                    if roll is not None:
+                        self.load_preset(roll)
                 case 'roll_preset':
-                    current_preset = values['roll_preset'][0]
-                    self.load_preset(current_preset)
+                    current_preset = self.preset_list.get_selected()
+                    if current_preset is not None:
+                        self.load_preset(current_preset)
+                case 'ai_on':
+                    self.load_messages().prefetch()
+                case RollMessageWorker.EVENT:
+                    self.show_result_message(*values[RollMessageWorker.EVENT])
                 case 'save_preset':
                     self.save_preset()
                 case 'edit_preset':
@@ -107,6 +126,9 @@ class MainWindow:
                     self.controller.character_service.save_characters()
                     break
 
+        self.message_worker.shutdown()
+        if self.roll_result_messages is not None:
+            self.roll_result_messages.close()
         self.window.close()
 
     def load_character(self, values):
@@ -318,13 +340,27 @@ class MainWindow:
         num_dice=int(self.window['dice_count'].get())
         dice_modifier=int(self.window['dice_modifier'].get())
         dice_type = self.window['dice_type'].get()
-        advantage_mode=self.get_advantage_selection()[0]
+        advantage_mode, advantage, _ = self.get_advantage_selection()
         is_d20_roll=self.controller.dice_roll_service.is_d20_roll(num_dice, dice_type)
+        preset_name = self.get_preset_name(num_dice, dice_type, dice_modifier, advantage)
         dice_roll=(self.controller.
                    dice_roll_service.
-                   roll_dice(num_dice, dice_type, dice_modifier, advantage_mode))
+                   roll_dice(num_dice, dice_type, dice_modifier, advantage_mode, preset_name))
         self.update_results(dice_roll, is_d20_roll)
 
+    def get_preset_name(self, num_dice, dice_type, dice_modifier, advantage):
+        """
+        Returns the name of the loaded preset if the roll settings still match it, so
+        the roll is counted in that preset's statistics, or an empty string.
+
+        :rtype: str
+        """
+        preset = self.loaded_preset
+        if preset is None or (int(preset.num_dice), preset.dice_type, int(preset.dice_modifier),
+                              preset.advantage) != (num_dice, dice_type, dice_modifier, advantage):
+            return ''
+        return preset.name
+
     def get_advantage_selection(self):
         """
         Determines the type of roll selection (advantage, disadvantage, or normal roll)
@@ -344,6 +380,20 @@ class MainWindow:
             return 2, 'disadvantage_roll', "Rolling with Disadvantage"
         return 3, 'normal_roll', ""
 
+    def load_messages(self):
+        """
+        Returns the roll result messages, creating them on first use so the AI
+        packages are not imported while AI messages stay off.
+
+        :rtype: Messages
+        """
+        if self.roll_result_messages is None:
+            from domain.models.messages import Messages
+
+            self.roll_result_messages = Messages()
+            self.message_worker.messages = self.roll_result_messages
+        return self.roll_result_messages
+
     def get_ai_selection(self):
         if self.window['ai_on'].get():
             return True
@@ -368,14 +418,29 @@ class MainWindow:
         self.window['dice_total'].update(value=f'{roll_result.total}')
 
 
+        # The message arrives later as a window event, so the roll shows immediately.
+        self.window['message_text'].update(value="")
         if self.get_ai_selection() and is_d20_roll:
-            result_message = self.roll_result_messages.result_message(roll_result.dice_total)
-            self.window['message_text'].update(value=f'{result_message}')
+            self.load_messages()
+            self.message_worker.request(roll_result.dice_total)
         else:
-            self.window['message_text'].update(value="")
+            self.message_worker.cancel()
 
         self.update_roll_history(roll_result)
 
+    def show_result_message(self, request_id, result_message):
+        """
+        Shows a roll message generated in the background, unless a later roll has
+        superseded the roll it was requested for.
+
+        :param request_id: The request the message answers.
+        :type request_id: int
+        :param result_message: The generated message.
+        :type result_message: str
+        """
+        if self.message_worker.is_current(request_id):
+            self.window['message_text'].update(value=f'{result_message}')
+
     def update_roll_history(self, roll_result):
         """
         Updates the roll history with a new roll result and refreshes the associated
@@ -385,8 +450,7 @@ class MainWindow:
         :type roll_result: int
         :return: None
         """
-        self.controller.roll_history.add_roll(roll_result)
-        self.window['roll_history'].update(values=self.controller.roll_history.get_rolls_by_type())
+        self.roll_history_view.add_roll(roll_result)
 
     def clear_roll_history(self):
         """
@@ -398,8 +462,7 @@ class MainWindow:
 
         :return: None
         """
-        self.controller.roll_history.clear()
-        self.window['roll_history'].update(values=self.controller.roll_history.get_rolls_by_type())
+        self.roll_history_view.clear()
 
         self.window['status_bar'].update(f'Roll History Cleared')
 
@@ -422,6 +485,7 @@ class MainWindow:
         self.window['dice_modifier'].update(value=0)
         self.window['dice_count'].update(value=1)
         self.window['dice_type'].update(value='d20')
+        self.loaded_preset = None
         self.window['equal_sign'].update(value='')
         self.window['dice_total'].update(value='')
 
@@ -463,17 +527,17 @@ class MainWindow:
             # Enable the edit/remove preset buttons
             self.window['edit_preset'].update(disabled=False)
             self.window['remove_preset'].update(disabled=False)
-            self.window['roll_preset'].update(values=self.controller.
-                                              preset_service.
-                                              get_presets_by_character(self.character.character_id))
+            self.preset_list.set_rows(self.controller.
+                                      preset_service.
+                                      get_presets_by_character(self.character.character_id))
         else:
             self.window['edit_preset'].update(disabled=True)
             self.window['remove_preset'].update(disabled=True)
 
-            self.window['roll_preset'].update(values=self.controller.
-                                          preset_service.
-                                          get_presets_by_type(roll_type=roll_type))
-        self.window['roll_preset'].update(set_to_index=[])  # clear selection so you don’t load stale preset
+            self.preset_list.set_rows(self.controller.
+                                      preset_service.
+                                      get_presets_by_type(roll_type=roll_type))
+        self.preset_list.clear_selection()  # clear selection so you don’t load stale preset
 
     def save_preset(self):
         """
@@ -504,8 +568,7 @@ class MainWindow:
                     character_id=self.character.character_id)
         self.controller.preset_service.add_preset(roll)
         self.window['status_bar'].update(f'Preset {roll.name} Added Successfully')
-        self.window['roll_preset'].update(values=self.controller.
-                                          preset_service.get_presets_by_type("custom"))
+        self.preset_list.set_rows(self.controller.preset_service.get_presets_by_type("custom"))
 
     def edit_preset(self, roll):
         """
@@ -528,8 +591,8 @@ class MainWindow:
             roll.dice_modifier = self.window['dice_modifier'].get()
             index = self.controller.preset_service.get_preset_index(roll)
             self.controller.preset_service.update_preset(roll, index)
-            self.window['roll_preset'].update(values=self.controller.
-                                              preset_service.get_presets_by_type("custom"))
+            self.preset_list.set_rows(self.controller.preset_service.get_presets_by_type("custom"),
+                                      keep_position=True)
             self.window['status_bar'].update(f'Preset {roll.name} Updated Successfully')
         else:
             sg.popup_ok('Cannot edit built-in presets.')
@@ -554,8 +617,9 @@ class MainWindow:
             if confirmation == 'Yes':
                 index = self.controller.preset_service.get_preset_index(roll)
                 self.controller.preset_service.remove_preset(index)
-                self.window['roll_preset'].update(values=self.controller.
-                                                  preset_service.get_presets_by_type("custom"))
+                self.preset_list.set_rows(self.controller.preset_service.get_presets_by_type("custom"),
+                                          keep_position=True)
+                self.preset_list.clear_selection()
                 self.window['status_bar'].update(f'Preset {roll.name} Removed Successfully')
         else:
             sg.popup_ok('Cannot remove built-in presets.')
@@ -570,8 +634,10 @@ class MainWindow:
             - dice_type: Type of dice to use for the roll.
             - advantage: A string key indicating the UI element that corresponds
               to the roll's advantage setting.
+            - name: The preset name given to rolls made with these settings.
         :return: None
         """
+        self.loaded_preset = roll
         self.window['dice_modifier'].update(value=roll.dice_modifier)
         self.window['dice_count'].update(value=roll.num_dice)
         self.window['dice_type'].update(value=roll.dice_type)
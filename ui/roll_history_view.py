@@ -0,0 +1,92 @@
+from ui.virtual_list import NewestFirst, VirtualList
+
+
+class RollHistoryView:
+    """
+    Keeps the roll history listbox in step with a `RollHistory`.
+
+    Rows are shown newest first through a `VirtualList`, so the listbox only ever
+    holds the rolls in view. Adding a roll renders one new label and reloads the
+    visible rows, and rolls the history evicts simply drop out of the sequence, so
+    the cost of a roll depends on the viewport and not on the length of the
+    session. When the list is scrolled back, it stays on the same rolls as new
+    ones arrive.
+
+    :ivar roll_history: The history shown by the listbox.
+    :type roll_history: RollHistory
+    :ivar virtual_list: The virtualized listbox showing the history.
+    :type virtual_list: VirtualList
+    """
+    def __init__(self, listbox, roll_history):
+        self.roll_history = roll_history
+        self.virtual_list = VirtualList(listbox, NewestFirst(roll_history), RollHistoryView.render)
+
+    def add_roll(self, roll):
+        """
+        Adds a roll to the history and shows it at the top of the listbox.
+
+        :param roll: The roll result to add.
+        :type roll: RollResult
+        """
+        self.roll_history.add_roll(roll)
+        self.virtual_list.rows_inserted(0)
+
+    def remove_roll(self, row):
+        """
+        Removes the roll shown at a row from the history and the listbox.
+
+        :param row: The row in the whole history, 0 being the newest roll.
+        :type row: int
+        """
+        self.roll_history.remove_roll(len(self.roll_history) - 1 - row)
+        self.virtual_list.rows_removed(row)
+
+    def clear(self):
+        """
+        Clears the history and the listbox.
+        """
+        self.roll_history.clear()
+        self.virtual_list.set_rows(NewestFirst(self.roll_history))
+
+    def refresh(self):
+        """
+        Reloads the rows in view, e.g. after the history was changed without going
+        through the view.
+        """
+        self.virtual_list.redraw()
+
+    def get_selected_roll(self):
+        """
+        Returns the roll of the selected row, or None if no row is selected.
+
+        :rtype: RollResult | None
+        """
+        return self.virtual_list.get_selected()
+
+    @staticmethod
+    def render(roll):
+        return repr(roll)
+
+
+if __name__ == '__main__':
+    # Times adding a roll to the listbox as the session grows (needs a display).
+    import time
+
+    import FreeSimpleGUI as sg
+
+    from domain.models.roll_history import RollHistory
+    from domain.services.dice_roll_service import DiceRollService
+
+    service = DiceRollService()
+    window = sg.Window('Roll history benchmark', [[sg.Listbox(values=[], size=(40, 10), key='roll_history')]],
+                       finalize=True)
+    view = RollHistoryView(window['roll_history'], RollHistory())
+    for session_length in (1_000, 10_000, 100_000):
+        while len(view.roll_history) < session_length:
+            view.add_roll(service.roll_dice(3, 'd6', 2, 0))
+        start = time.perf_counter()
+        for _ in range(1_000):
+            view.add_roll(service.roll_dice(3, 'd6', 2, 0))
+            window.refresh()
+        print(f"{session_length:>7,} rolls in history: {(time.perf_counter() - start):.3f} ms per roll")
+    window.close()
@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RollMessageWorker:
+    """
+    Generates roll messages on a background thread so the GUI event loop never
+    waits on the network.
+
+    Each request gets an increasing id. The generated message is posted back to
+    the window as an `EVENT` event whose value is (request id, message), to be
+    handled by the `MainWindow.run` loop. Starting a new request cancels the
+    previous one if it has not started yet; if it has, its message is dropped on
+    arrival because `is_current` no longer holds for its id.
+
+    :ivar messages: Generates the message for a roll result. It may be set after
+        the worker is created, as long as it is set before the first request.
+    :type messages: Messages | None
+    :ivar window: The window the messages are posted to.
+    :type window: sg.Window
+    """
+    EVENT = 'roll_message'
+
+    def __init__(self, messages, window):
+        self.messages = messages
+        self.window = window
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='roll-message')
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._pending = None
+
+    def request(self, result):
+        """
+        Starts generating the message for a d20 result, superseding earlier requests.
+
+        :param result: The d20 roll result.
+        :type result: int
+        :return: The id of the request.
+        :rtype: int
+        """
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+            if self._pending is not None:
+                self._pending.cancel()
+            self._pending = self._executor.submit(self._generate, request_id, result)
+        return request_id
+
+    def cancel(self):
+        """
+        Supersedes any outstanding request without starting a new one.
+        """
+        with self._lock:
+            self._request_id += 1
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+
+    def is_current(self, request_id):
+        with self._lock:
+            return request_id == self._request_id
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generate(self, request_id, result):
+        if not self.is_current(request_id):
+            return
+        message = self.messages.result_message(result)
+        if self.is_current(request_id):
+            self.window.write_event_value(RollMessageWorker.EVENT, (request_id, message))
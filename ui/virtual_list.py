@@ -0,0 +1,217 @@
+from collections.abc import Sequence
+
+
+class VirtualList:
+    """
+    Shows a sequence of rows of any length in a listbox by loading only the rows
+    in view.
+
+    The listbox never holds more than its height in rows. Scrolling with the
+    scrollbar, the mouse wheel or the arrow and page keys moves a window over the
+    sequence and reloads the visible rows, so memory and redraw cost depend on the
+    size of the viewport rather than the number of rows. Row labels are cached
+    while their rows stay in view.
+
+    The listbox element's values are the visible rows, so the row of a selected
+    line is read by PySimpleGUI as usual.
+
+    :ivar listbox: The listbox element showing the rows.
+    :type listbox: sg.Listbox
+    :ivar rows: The rows, e.g. a list or a `NewestFirst` view of a roll history.
+    :type rows: Sequence
+    :ivar offset: The index of the first visible row.
+    :type offset: int
+    :ivar height: The number of rows in view.
+    :type height: int
+    """
+    def __init__(self, listbox, rows=(), render=repr):
+        """
+        :param listbox: A finalized listbox element.
+        :type listbox: sg.Listbox
+        :param rows: The rows to show.
+        :type rows: Sequence
+        :param render: Returns the label of a row.
+        :type render: Callable[[Any], str]
+        """
+        self.listbox = listbox
+        self.rows = rows
+        self.render = render
+        self.offset = 0
+        self.height = int(listbox.TKListbox.cget('height'))
+        self._labels = {}
+        self._selected = None
+
+        widget = listbox.TKListbox
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            widget.bind(sequence, self._on_mouse_wheel)
+        for sequence, delta in (('<Up>', -1), ('<Down>', 1), ('<Prior>', -self.height), ('<Next>', self.height)):
+            widget.bind(sequence, lambda event, delta=delta: self._on_key(delta))
+        widget.bind('<<ListboxSelect>>', self._on_select, add='+')
+        widget.configure(yscrollcommand=lambda first, last: self._update_scrollbar())
+        scrollbar = getattr(listbox, 'vsb', None)
+        if scrollbar is not None:
+            scrollbar.configure(command=self._on_scrollbar)
+        self.redraw()
+
+    def set_rows(self, rows, keep_position=False):
+        """
+        Replaces the rows shown, scrolling back to the top unless `keep_position`.
+        Every label is rendered again, so rows changed in place are shown as they are now.
+
+        :param rows: The new rows.
+        :type rows: Sequence
+        :param keep_position: Whether to keep the current scroll position.
+        :type keep_position: bool
+        """
+        self.rows = rows
+        self._labels = {}
+        if not keep_position:
+            self.offset = 0
+            self._selected = None
+        self.redraw()
+
+    def rows_inserted(self, index, count=1):
+        """
+        Reloads the view after `count` rows were inserted into `rows` at `index`,
+        keeping the same rows in view and selected unless the view is at the top.
+
+        :param index: Where the rows were inserted.
+        :type index: int
+        :param count: How many rows were inserted.
+        :type count: int
+        """
+        if index < self.offset or (index == self.offset and self.offset > 0):
+            self.offset += count
+        if self._selected is not None and index <= self._selected:
+            self._selected += count
+        self.redraw()
+
+    def rows_removed(self, index, count=1):
+        """
+        Reloads the view after `count` rows were removed from `rows` at `index`.
+
+        :param index: Where the rows were removed.
+        :type index: int
+        :param count: How many rows were removed.
+        :type count: int
+        """
+        if index < self.offset:
+            self.offset = max(index, self.offset - count)
+        if self._selected is not None:
+            if index <= self._selected < index + count:
+                self._selected = None
+            elif self._selected >= index + count:
+                self._selected -= count
+        self.redraw()
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.redraw()
+
+    def scroll(self, delta):
+        self.scroll_to(self.offset + delta)
+
+    def redraw(self):
+        """
+        Reloads the rows in view.
+        """
+        self.offset = max(0, min(self.offset, len(self.rows) - self.height))
+        visible = [self.rows[index] for index in range(self.offset, min(self.offset + self.height, len(self.rows)))]
+        labels = {}
+        for row in visible:
+            label = self._labels.get(id(row))
+            labels[id(row)] = self.render(row) if label is None else label
+        self._labels = labels
+
+        widget = self.listbox.TKListbox
+        widget.delete(0, 'end')
+        if visible:
+            widget.insert(0, *(labels[id(row)] for row in visible))
+        self.listbox.Values = visible
+        if self._selected is not None and 0 <= self._selected - self.offset < len(visible):
+            widget.selection_set(self._selected - self.offset)
+        self._update_scrollbar()
+
+    def get_selected_index(self):
+        """
+        Returns the index in `rows` of the selected row, or None.
+
+        :rtype: int | None
+        """
+        return self._selected
+
+    def get_selected(self):
+        """
+        Returns the selected row, or None.
+
+        :rtype: Any
+        """
+        if self._selected is None or self._selected >= len(self.rows):
+            return None
+        return self.rows[self._selected]
+
+    def clear_selection(self):
+        self._selected = None
+        self.listbox.TKListbox.selection_clear(0, 'end')
+
+    def _on_select(self, event=None):
+        indexes = self.listbox.get_indexes()
+        self._selected = self.offset + int(indexes[0]) if indexes else None
+
+    def _on_mouse_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll(-3)
+        else:
+            self.scroll(3)
+        return 'break'
+
+    def _on_key(self, delta):
+        # Arrow keys move the selection, scrolling when it leaves the view.
+        if self._selected is None:
+            self.scroll(delta)
+            return 'break'
+        self._selected = max(0, min(self._selected + delta, len(self.rows) - 1))
+        if self._selected < self.offset:
+            self.offset = self._selected
+        elif self._selected >= self.offset + self.height:
+            self.offset = self._selected - self.height + 1
+        self.redraw()
+        self.listbox.TKListbox.event_generate('<<ListboxSelect>>')
+        return 'break'
+
+    def _on_scrollbar(self, command, value, unit=None):
+        match command:
+            case 'moveto':
+                self.scroll_to(round(float(value) * len(self.rows)))
+            case 'scroll' if unit == 'pages':
+                self.scroll(int(value) * self.height)
+            case 'scroll':
+                self.scroll(int(value))
+
+    def _update_scrollbar(self):
+        scrollbar = getattr(self.listbox, 'vsb', None)
+        if scrollbar is None:
+            return
+        if not self.rows:
+            scrollbar.set(0.0, 1.0)
+            return
+        scrollbar.set(self.offset / len(self.rows), min(1.0, (self.offset + self.height) / len(self.rows)))
+
+
+class NewestFirst(Sequence):
+    """
+    A read-only view of a roll history with the newest roll first, for `VirtualList`.
+
+    :ivar roll_history: The roll history.
+    :type roll_history: RollHistory
+    """
+    def __init__(self, roll_history):
+        self.roll_history = roll_history
+
+    def __len__(self):
+        return len(self.roll_history)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.roll_history):
+            raise IndexError("Roll index out of range")
+        return self.roll_history.get_roll(len(self.roll_history) - 1 - index)